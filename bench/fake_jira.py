@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# Local stand-in for the jira REST and agile endpoints used by `ja`.
+#
+#   python bench/fake_jira.py --port 8080 --latency-ms 50 --issues 10000
+#
+# The dataset is generated deterministically from the sizes, every response
+# waits `latency_ms` and list endpoints cap maxResults like jira does.
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+import functools
+import json
+import math
+import re
+import threading
+import time
+
+PROJECT_KEY = "CFCCON"
+BOARD_ID = "1"
+STATUSES = ["To Do", "To Develop", "In Progress", "In Review", "In Test", "Done"]
+TRANSITIONS = {"To Do": "11", "To Develop": "61", "In Progress": "21"}
+TRANSITIONS.update({"In Review": "31", "In Test": "51", "Done": "41"})
+USERS = ["bench", "alice", "bob", "carol", "dave"]
+WORDS = "login billing export report sprint board cache search api page user".split()
+
+
+@dataclass
+class Dataset:
+    issues: int = 10000
+    sprints: int = 500
+    epics: int = 300
+    comments: int = 20
+    description_lines: int = 40
+    by_key: Dict[str, dict] = field(default_factory=dict)
+    ordered: List[dict] = field(default_factory=list)
+    sprint_values: List[dict] = field(default_factory=list)
+    epic_values: List[dict] = field(default_factory=list)
+    active_sprint_id: int = 0
+
+    def __post_init__(self):
+        for i in range(self.sprints):
+            state = "closed" if i < self.sprints - 4 else "future"
+            if i == self.sprints - 4:
+                state = "active"
+                self.active_sprint_id = 1000 + i
+            name = f"Sprint {i + 1}" if i != self.sprints - 3 else "Sprint N + 1"
+            self.sprint_values.append({"id": 1000 + i, "name": name, "state": state})
+        for i in range(self.epics):
+            self.epic_values.append(
+                {
+                    "id": 50000 + i,
+                    "key": f"{PROJECT_KEY}-{90000 + i}",
+                    "name": f"Epic {i}",
+                }
+            )
+        for i in range(1, self.issues + 1):
+            issue = self.make_issue(i)
+            self.by_key[issue["key"]] = issue
+            self.ordered.append(issue)
+        self.ordered.reverse()
+
+    def make_issue(self, i: int) -> dict:
+        words = " ".join(WORDS[(i * k) % len(WORDS)] for k in (1, 3, 7))
+        description = "\n".join(
+            f"h3. Step {n}\n* {words} *{n}* {{code}}x = {n}{{code}}"
+            for n in range(self.description_lines // 2)
+        )
+        sprint_id = self.active_sprint_id if i % 10 == 0 else 1000 + i % self.sprints
+        return {
+            "id": str(100000 + i),
+            "key": f"{PROJECT_KEY}-{i}",
+            "sprint": sprint_id,
+            "fields": {
+                "summary": f"{words.capitalize()} {i}",
+                "description": f"Acceptance Criteria\n{description}\nHow\n{words}",
+                "status": {"name": STATUSES[i % len(STATUSES)]},
+                "issuetype": {"id": "10001", "name": "Story"},
+                "assignee": {
+                    "displayName": USERS[i % len(USERS)],
+                    "name": USERS[i % len(USERS)],
+                },
+                "customfield_10006": float(i % 8),
+                "customfield_10003": (
+                    self.epic_values[i % self.epics]["key"] if self.epics else None
+                ),
+                "customfield_11100": "{pullrequest={dataType=pullrequest, state=OPEN, "
+                "stateCount=1}, details=PullRequestOverallDetails{openCount=1}}",
+                "updated": "2026-10-01T10:00:00.000+0000",
+            },
+        }
+
+    def comments_for(self, key: str) -> List[dict]:
+        return [
+            {
+                "id": str(n),
+                "author": {"displayName": USERS[n % len(USERS)]},
+                "body": f"Comment {n} on {key}\n* looks good\n* {{code}}ok{{code}}",
+                "created": f"2026-09-{1 + n % 28:02d}T10:00:00.000+0000",
+                "updated": f"2026-09-{1 + n % 28:02d}T10:00:00.000+0000",
+            }
+            for n in range(self.comments)
+        ]
+
+
+@functools.lru_cache(maxsize=64)
+def jql_keys(jql: str) -> Optional[frozenset]:
+    keys = re.search(r"key in \(([^)]*)\)", jql)
+    return frozenset(k.strip(' "') for k in keys.group(1).split(",")) if keys else None
+
+
+def match_jql(issue: dict, jql: str) -> bool:
+    fields = issue["fields"]
+    keys = jql_keys(jql)
+    if keys is not None and issue["key"] not in keys:
+        return False
+    statuses = re.search(r'status in \(([^)]*)\)|status = "([^"]*)"', jql)
+    if statuses:
+        names = statuses.group(1) or f'"{statuses.group(2)}"'
+        if fields["status"]["name"] not in [n.strip(' "') for n in names.split(",")]:
+            return False
+    sprint = re.search(r"sprint = (\d+)", jql)
+    if sprint and issue["sprint"] != int(sprint.group(1)):
+        return False
+    updated = re.search(r'updated >= "-(\d+)m"', jql)
+    if updated and issue.get("touched", 0) < time.time() - int(updated.group(1)) * 60:
+        return False
+    assignee = re.search(r"assignee in \(([^)]*)\)", jql)
+    if assignee and fields["assignee"]["name"] not in assignee.group(1):
+        return False
+    return True
+
+
+def project(issue: dict, fields: Optional[str], comments=None) -> dict:
+    result = {"id": issue["id"], "key": issue["key"], "fields": issue["fields"]}
+    if fields:
+        names = fields.split(",")
+        result["fields"] = {k: v for (k, v) in issue["fields"].items() if k in names}
+    else:
+        result["fields"] = dict(issue["fields"], comment={"comments": comments or []})
+    return result
+
+
+@dataclass
+class Stats:
+    requests: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    limited: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, sent: int, received: int, status: int = 200):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            self.bytes_received += received
+            self.limited += 1 if status == 429 else 0
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "limited": self.limited,
+            }
+
+
+@dataclass
+class RateLimit:
+    # token bucket like the one in front of a jira cloud site, 0 disables it
+    rate: float = 0.0
+    burst: float = 10.0
+    tokens: float = 10.0
+    updated: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def take(self) -> float:
+        """Returns 0 when the request may go, else the seconds to wait"""
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            refill = (now - self.updated) * self.rate
+            self.tokens = min(self.burst, self.tokens + refill)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+def make_handler(
+    dataset: Dataset,
+    stats: Stats,
+    latency_ms: float,
+    page_size: int,
+    limit: Optional[RateLimit] = None,
+):
+    limit = limit or RateLimit()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status: int, body=None, received=0, headers=None):
+            time.sleep(latency_ms / 1000)
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for (name, value) in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+            stats.add(len(data), received, status)
+
+        def limited(self) -> bool:
+            wait = limit.take()
+            if not wait:
+                return False
+            headers = {"Retry-After": str(math.ceil(wait)), "X-RateLimit-Remaining": "0"}
+            self.reply(429, {"errorMessages": ["Rate limit exceeded"]}, headers=headers)
+            return True
+
+        def page(self, items, query: dict, key: str, cap: int, total=True, fields=""):
+            start = int(query.get("startAt", ["0"])[0])
+            size = min(int(query.get("maxResults", [str(cap)])[0]), cap)
+            values = items[start : start + size]
+            if fields != "":
+                values = [project(i, fields) for i in values]
+            body = {"startAt": start, "maxResults": size, key: values}
+            if total:
+                body["total"] = len(items)
+            else:
+                body["isLast"] = start + size >= len(items)
+            return body
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            path = unquote(url.path)
+            if path == "/__bench/stats":
+                data = json.dumps(stats.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            if self.limited():
+                return
+            jql = unquote(query.get("jql", [""])[0])
+            fields = query.get("fields", [None])[0]
+
+            result = re.match(
+                r"^/rest/api/2/issue/([^/]+)(/comment|/transitions)?$", path
+            )
+            if result:
+                issue = dataset.by_key.get(result.group(1))
+                if issue is None:
+                    return self.reply(404, {"errorMessages": ["Issue does not exist"]})
+                if result.group(2) == "/comment":
+                    comments = dataset.comments_for(issue["key"])
+                    if query.get("orderBy", [""])[0] == "-created":
+                        comments.reverse()
+                    return self.reply(200, self.page(comments, query, "comments", 50))
+                if result.group(2) == "/transitions":
+                    transitions = [
+                        {"id": id, "name": name, "to": {"name": name}}
+                        for (name, id) in TRANSITIONS.items()
+                    ]
+                    return self.reply(200, {"transitions": transitions})
+                comments = dataset.comments_for(issue["key"])
+                return self.reply(200, project(issue, fields, comments))
+
+            if path == "/rest/api/2/search":
+                issues = [i for i in dataset.ordered if match_jql(i, jql)]
+                body = self.page(issues, query, "issues", page_size, fields=fields)
+                return self.reply(200, body)
+
+            result = re.match(r"^/rest/agile/1.0/board/\d+/sprint/(\d+)/issue$", path)
+            if result:
+                jql = f"sprint = {result.group(1)} AND {jql}"
+                issues = [i for i in dataset.ordered if match_jql(i, jql)]
+                body = self.page(issues, query, "issues", 50, fields=fields)
+                return self.reply(200, body)
+
+            if re.match(r"^/rest/agile/1.0/board/\d+/sprint$", path):
+                state = query.get("state", [None])[0]
+                sprints = [
+                    s for s in dataset.sprint_values if not state or s["state"] == state
+                ]
+                return self.reply(
+                    200, self.page(sprints, query, "values", 50, total=False)
+                )
+
+            if re.match(r"^/rest/agile/1.0/board/\d+/epic$", path):
+                return self.reply(
+                    200,
+                    self.page(dataset.epic_values, query, "values", 50, total=False),
+                )
+
+            return self.reply(404, {"errorMessages": [f"unknown endpoint {path}"]})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = self.rfile.read(length)
+            path = urlparse(self.path).path
+            if self.limited():
+                return
+            result = re.match(r"^/rest/api/2/issue/([^/]+)/transitions$", path)
+            if result:
+                issue = dataset.by_key.get(result.group(1))
+                if issue is None:
+                    return self.reply(404, {"errorMessages": ["Issue does not exist"]})
+                transition = json.loads(payload or b"{}").get("transition") or {}
+                names = {id: name for (name, id) in TRANSITIONS.items()}
+                if transition.get("id") not in names:
+                    body = {"errorMessages": ["Transition id is not valid"]}
+                    return self.reply(400, body, received=len(payload))
+                issue["fields"]["status"] = {"name": names[transition["id"]]}
+                issue["fields"]["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+                issue["touched"] = time.time()
+                return self.reply(204, received=len(payload))
+            if path == "/rest/inline-create/1.0/issue":
+                body = {
+                    "issue": {"issueKey": f"{PROJECT_KEY}-{len(dataset.ordered) + 1}"}
+                }
+                return self.reply(201, body, received=len(payload))
+            return self.reply(404, {"errorMessages": [f"unknown endpoint {path}"]})
+
+    return Handler
+
+
+def start(dataset: Dataset, latency_ms=0.0, page_size=100, port=0, rate_limit=0.0):
+    stats = Stats()
+    limit = RateLimit(rate=rate_limit)
+    handler = make_handler(dataset, stats, latency_ms, page_size, limit)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return (server, stats)
+
+
+def main():
+    parser = ArgumentParser(description="fake jira server for ja benchmarks")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--issues", type=int, default=10000)
+    parser.add_argument("--sprints", type=int, default=500)
+    parser.add_argument("--epics", type=int, default=300)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/s")
+    args = parser.parse_args()
+    dataset = Dataset(args.issues, args.sprints, args.epics)
+    (server, stats) = start(
+        dataset, args.latency_ms, args.page_size, args.port, args.rate_limit
+    )
+    print(f"fake jira on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(stats.snapshot())
+
+
+if __name__ == "__main__":
+    main()
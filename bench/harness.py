@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# Benchmarks `ja` commands against the fake jira in bench/fake_jira.py.
+#
+#   python bench/harness.py [--latency-ms 50] [--issues 10000] [--runs 3]
+#   python bench/harness.py --compare bench/results/<previous>.json
+#
+# Every scenario runs in a fresh child process with its own $HOME, so caches
+# never leak between runs. Prompts are answered with the first choice. The
+# child reports wall time and peak RSS, and the fake server counts requests
+# and bytes. Results are written as JSON so versions can be compared.
+from argparse import SUPPRESS, ArgumentParser, Namespace
+from typing import Dict, List, Optional
+import builtins
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+CLI_DIR = f"{ROOT}/cli"
+sys.path.insert(0, BENCH_DIR)
+
+import fake_jira  # noqa: E402
+
+SCENARIOS: Dict[str, dict] = {
+    "desc": {"argv": ["--desc", "-j", "CFCCON-42", "--no-cache"]},
+    "desc_cached": {"argv": ["--desc", "-j", "CFCCON-42"], "warmup": True},
+    "search": {"argv": ["--search", "--live", "--no-cache"], "inputs": ["", "", "y"]},
+    "create": {"argv": ["--new", "--no-cache"], "inputs": ["n"], "git": True},
+    "pr": {
+        "argv": ["--pr", "--no-cache"],
+        "inputs": ["n", ""],
+        "git": True,
+        "branch": "s1/CFCCON-42-bench",
+    },
+    "create_jira_ticket": {"argv": ["--create", "--no-cache"]},
+    "create_jira_ticket_cached": {"argv": ["--create"], "warmup": True},
+    "get_all_epics": {"argv": ["--no-cache"], "call": "get_all_epics"},
+    "sync": {"argv": ["--sync"]},
+    "transition": {
+        "argv": ["--transition", "Done"] + [f"CFCCON-{n}" for n in range(1, 51)],
+    },
+}
+
+
+def write_config(home: str, port: int, dataset: fake_jira.Dataset):
+    config = {
+        "version": "1",
+        "jira": {
+            "host": f"http://127.0.0.1:{port}",
+            "session": "bench",
+            "remember_me": "",
+            "project_key": fake_jira.PROJECT_KEY,
+            "user_id": "bench",
+            "board_id": fake_jira.BOARD_ID,
+            "active_sprint_id": dataset.active_sprint_id,
+        },
+        "github": {"host": "github.com", "main_branch": "main", "repo": "bench/ja"},
+    }
+    # json is valid yaml, so the config does not need yaml to be written
+    with open(f"{home}/.jarc.yml", "w") as fh:
+        json.dump(config, fh)
+
+
+def create_repo(path: str, branch: Optional[str]):
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "init"], cwd=path)
+    if branch:
+        subprocess.run(["git", "checkout", "-q", "-b", branch], cwd=path, check=True)
+
+
+def server_stats(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/__bench/stats") as res:
+        return json.load(res)
+
+
+def run_child(args: Namespace):
+    scenario = SCENARIOS[args.child]
+    sys.path.insert(0, CLI_DIR)
+    import inquirer
+    import run
+
+    def prompt(questions, *_, **__):
+        answers = {}
+        for question in questions:
+            choices = list(getattr(question, "choices", None) or [])
+            answers[question.name] = choices[0] if choices else "bench"
+        return answers
+
+    inputs = iter(scenario.get("inputs", []))
+    inquirer.prompt = prompt
+    builtins.input = lambda message="": next(inputs, "")
+    run.has_tool = lambda name: False
+    # no clipboard or browser from a benchmark
+    run.RepoContext.copy = lambda self, text: True
+    run.RepoContext.open_link = lambda self, link, press_enter_message=False: None
+
+    parser = run.build_parser()
+    cli_args = parser.parse_args(scenario["argv"])
+    env = run.get_env(cli_args)
+
+    def command():
+        jira = run.JiraApi(env, cli_args)
+        if scenario.get("call") == "get_all_epics":
+            jira.get_all_epics(env.jira_board_id)
+            return 0
+        try:
+            run.run_command(parser, cli_args, env, jira)
+        except SystemExit as e:
+            return e.code or 0
+        return 0
+
+    if scenario.get("warmup"):
+        command()
+    before = server_stats(args.port)
+    start = time.perf_counter()
+    code = command()
+    elapsed = time.perf_counter() - start
+    after = server_stats(args.port)
+    result = {
+        "wall_ms": round(elapsed * 1000, 2),
+        "exit_code": code,
+        "requests": after["requests"] - before["requests"],
+        "bytes_sent": after["bytes_sent"] - before["bytes_sent"],
+        "bytes_received": after["bytes_received"] - before["bytes_received"],
+        "limited": after["limited"] - before["limited"],
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    with open(args.result, "w") as fh:
+        json.dump(result, fh)
+
+
+def run_scenario(name: str, port: int, dataset, verbose: bool) -> Optional[dict]:
+    scenario = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as home:
+        write_config(home, port, dataset)
+        cwd = home
+        if scenario.get("git"):
+            cwd = f"{home}/repo"
+            create_repo(cwd, scenario.get("branch"))
+        result_path = f"{home}/result.json"
+        env = {**os.environ, "HOME": home, "XDG_CACHE_HOME": f"{home}/.cache"}
+        output = None if verbose else subprocess.DEVNULL
+        subprocess.run(
+            [sys.executable, __file__, "--child", name, "--port", str(port)]
+            + ["--result", result_path],
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=output,
+            stderr=output,
+        )
+        if not os.path.isfile(result_path):
+            return None
+        with open(result_path) as fh:
+            return json.load(fh)
+
+
+def summarize(runs: List[dict]) -> dict:
+    runs = sorted(runs, key=lambda r: r["wall_ms"])
+    result = dict(runs[len(runs) // 2])
+    result["peak_rss_kb"] = max(r["peak_rss_kb"] for r in runs)
+    result["runs"] = len(runs)
+    return result
+
+
+def git_version() -> str:
+    result = subprocess.run(
+        ["git", "describe", "--always", "--dirty"],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def compare(results: dict, previous_path: str, threshold: float) -> bool:
+    with open(previous_path) as fh:
+        previous = json.load(fh)
+    regressed = False
+    print(f"\ncompared with {previous_path} ({previous.get('version')})")
+    for (name, result) in results["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        ratio = result["wall_ms"] / max(before["wall_ms"], 0.001)
+        more_requests = result["requests"] > before["requests"]
+        slower = ratio > 1 + threshold
+        regressed = regressed or slower or more_requests
+        flag = "regression" if slower or more_requests else "ok"
+        print(
+            f"{name.ljust(20)} {before['wall_ms']:>9.1f}ms -> {result['wall_ms']:>9.1f}ms "
+            f"({ratio:.2f}x) requests {before['requests']} -> {result['requests']} [{flag}]"
+        )
+    return regressed
+
+
+def main():
+    parser = ArgumentParser(description="ja benchmarks against a fake jira")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--issues", type=int, default=10000)
+    parser.add_argument("--sprints", type=int, default=500)
+    parser.add_argument("--epics", type=int, default=300)
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="server side requests/s"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="defaults to bench/results/<version>.json")
+    parser.add_argument("--compare", help="previous results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--child", help=SUPPRESS)
+    parser.add_argument("--port", type=int, help=SUPPRESS)
+    parser.add_argument("--result", help=SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+        return
+
+    dataset = fake_jira.Dataset(args.issues, args.sprints, args.epics)
+    (server, _) = fake_jira.start(
+        dataset, args.latency_ms, args.page_size, rate_limit=args.rate_limit
+    )
+    port = server.server_address[1]
+    results = {
+        "version": git_version(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {
+            "latency_ms": args.latency_ms,
+            "page_size": args.page_size,
+            "issues": args.issues,
+            "sprints": args.sprints,
+            "epics": args.epics,
+            "rate_limit": args.rate_limit,
+        },
+        "scenarios": {},
+    }
+    print(
+        f"{'scenario'.ljust(20)} {'wall':>11} {'requests':>9} {'429s':>5} "
+        f"{'KB':>9} {'rss MB':>7}"
+    )
+    for name in args.scenario or list(SCENARIOS):
+        runs = [
+            run_scenario(name, port, dataset, args.verbose) for _ in range(args.runs)
+        ]
+        if not all(runs):
+            print(f"{name.ljust(20)} failed, run with --verbose to see the output")
+            continue
+        result = summarize(runs)
+        results["scenarios"][name] = result
+        print(
+            f"{name.ljust(20)} {result['wall_ms']:>9.1f}ms {result['requests']:>9} "
+            f"{result['limited']:>5} {result['bytes_sent'] / 1024:>9.1f} "
+            f"{result['peak_rss_kb'] / 1024:>7.1f}"
+        )
+    server.shutdown()
+
+    output = args.output or f"{BENCH_DIR}/results/{results['version']}.json"
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"\nsaved {output}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# Micro-benchmark for render_jira on large descriptions.
+#
+#   python bench/render.py [--max-kb 2048] [--runs 5]
+#
+# The description doubles in size each step. The time per KB has to stay flat
+# (within --tolerance of the smallest size), otherwise rendering is not linear
+# and the script exits with 1.
+from argparse import ArgumentParser
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, f"{ROOT}/cli")
+
+from run import render_jira  # noqa: E402
+
+BLOCK = """h2. Acceptance Criteria
+* the *export* button downloads a [csv|https://example.com/export?a=1] file
+** with {{utf-8}} headers and _quoted_ "values" like $HOME and 'single'
+# first step {color:red}must{color} pass (/)
+# second step +underlined+ for [~jdoe]
+{code:python}
+rows = [r for r in report if r.get("total") * 2 > 10]
+{code}
+||field||type||notes||
+|id|int|primary [key|https://example.com/k]|
+|name|text|{code}len <= 255{code}|
+----
+bq. ship it behind a flag
+How
+plain text that goes on for a while with 2*3 and snake_case_names in it
+"""
+
+
+def measure(text: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        render_jira(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description="render_jira micro-benchmark")
+    parser.add_argument("--min-kb", type=int, default=16)
+    parser.add_argument("--max-kb", type=int, default=2048)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'size'.rjust(10)} {'render':>10} {'per KB':>10}")
+    per_kb = []
+    size_kb = args.min_kb
+    while size_kb <= args.max_kb:
+        text = BLOCK * max(1, size_kb * 1024 // len(BLOCK))
+        seconds = measure(text, args.runs)
+        kb = len(text) / 1024
+        per_kb.append(seconds * 1e6 / kb)
+        print(f"{kb:>8.0f}KB {seconds * 1000:>8.2f}ms {per_kb[-1]:>8.1f}us")
+        size_kb *= 2
+
+    growth = max(per_kb) / min(per_kb)
+    linear = growth <= 1 + args.tolerance
+    print(f"\nper KB growth {growth:.2f}x [{'ok' if linear else 'not linear'}]")
+    if not linear:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
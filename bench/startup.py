@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# Startup-time regression check for the `ja` entry point.
+#
+#   python bench/startup.py [--budget-ms 50] [--runs 9]
+#
+# Each command is run with `-X importtime` in a throwaway $HOME. The check
+# fails when a command imports one of the heavy modules or when its median wall
+# time exceeds a bare interpreter start by more than the budget.
+from argparse import ArgumentParser
+from typing import Dict, List, Set, Tuple
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY = f"{ROOT}/bin/ja"
+COMMANDS = [["--version"], ["--help"]]
+HEAVY_MODULES = {"requests", "urllib3", "yaml", "inquirer", "emoji", "blessed"}
+
+
+def run(argv: List[str], home: str, importtime=False) -> Tuple[float, str]:
+    env = {**os.environ, "HOME": home}
+    # bytecode must be cached, as it is for a normal install
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    flags = ["-X", "importtime"] if importtime else []
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *flags, *argv],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    return (time.perf_counter() - start, result.stderr)
+
+
+def imported_modules(importtime: str) -> Dict[str, int]:
+    modules = {}
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        (_, self_us, name) = line.split("|", 2)
+        self_us = self_us.strip()
+        if not self_us.isdigit():
+            continue
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def median(values: List[float]) -> float:
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def measure(argv: List[str], home: str, runs: int) -> Tuple[float, Dict[str, int]]:
+    (_, importtime) = run(argv, home, importtime=True)
+    timings = [run(argv, home)[0] for _ in range(runs)]
+    return (median(timings), imported_modules(importtime))
+
+
+def main():
+    parser = ArgumentParser(description="ja startup budget check")
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=9)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        (baseline, baseline_modules) = measure(["-c", "pass"], home, args.runs)
+        print(f"python -c pass: {baseline * 1000:.1f}ms")
+        for command in COMMANDS:
+            (elapsed, modules) = measure([ENTRY, *command], home, args.runs)
+            extra: Set[str] = set(modules) - set(baseline_modules)
+            heavy = sorted({name.split(".")[0] for name in extra} & HEAVY_MODULES)
+            overhead = (elapsed - baseline) * 1000
+            import_ms = sum(modules[name] for name in extra) / 1000
+            ok = overhead <= args.budget_ms and not heavy
+            failed = failed or not ok
+            print(
+                f"ja {' '.join(command)}: {elapsed * 1000:.1f}ms "
+                f"(+{overhead:.1f}ms, imports {import_ms:.1f}ms) "
+                f"[{'ok' if ok else 'over budget'}]"
+            )
+            if heavy:
+                print(f"  heavy modules imported: {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# Thin client for `ja --daemon`. This module only imports the standard library
+# pieces it needs so a forwarded command does not pay for loading the cli.
+from typing import List, Optional
+import json
+import os
+import sys
+
+CLI_DIR = os.path.dirname(os.path.realpath(__file__))
+RUN_PATH = f"{CLI_DIR}/run.py"
+# a daemon only serves clients started from the same code as itself
+CODE_PATHS = [
+    RUN_PATH,
+    f"{CLI_DIR}/client.py",
+    f"{CLI_DIR}/options.py",
+    f"{os.path.dirname(CLI_DIR)}/bin/ja",
+]
+CACHE_DIR = f"{os.environ.get('XDG_CACHE_HOME') or os.environ['HOME'] + '/.cache'}/ja"
+DAEMON_SOCKET = f"{CACHE_DIR}/daemon.sock"
+DAEMON_PID = f"{CACHE_DIR}/daemon.pid"
+IN_PROCESS_FLAGS = {"--daemon", "--no-daemon"}
+# answered by the parser in options.py alone, without loading run.py
+PARSER_ONLY_FLAGS = {"--help", "-h", "--version"}
+
+
+def code_version() -> str:
+    stamps = []
+    for path in CODE_PATHS:
+        try:
+            stamps.append(str(os.stat(path).st_mtime_ns))
+        except OSError:
+            stamps.append("-")
+    return ",".join(stamps)
+
+
+def read_line(client) -> Optional[dict]:
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = client.recv(4096)
+        if not chunk:
+            return None
+        data += chunk
+    return json.loads(data)
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    if IN_PROCESS_FLAGS.intersection(argv) or not os.path.exists(DAEMON_SOCKET):
+        return None
+    import socket
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(DAEMON_SOCKET)
+        request = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "environ": dict(os.environ),
+            "version": code_version(),
+        }
+        payload = json.dumps(request).encode() + b"\n"
+        socket.send_fds(client, [payload], [0, 1, 2])
+    except OSError:
+        client.close()
+        return None
+
+    # the daemon owns the terminal until it replies, ctrl-c is forwarded so
+    # it can interrupt the command the same way it would in-process
+    while True:
+        try:
+            reply = read_line(client)
+            break
+        except KeyboardInterrupt:
+            try:
+                client.sendall(b"interrupt\n")
+            except OSError:
+                reply = None
+                break
+        except (OSError, ValueError):
+            reply = None
+            break
+    client.close()
+    if reply is None:
+        sys.stderr.write("ja daemon closed the connection\n")
+        return 1
+    # a daemon started from different code refuses the command, run it here
+    if reply.get("code") is None:
+        return None
+    return reply["code"]
+
+
+def main():
+    if PARSER_ONLY_FLAGS.intersection(sys.argv[1:]):
+        # the parser prints help or the version and exits, run.py is not needed
+        from options import build_parser
+
+        build_parser().parse_args()
+    code = forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
+    from run import entrypoint
+
+    entrypoint()
+
+
+if __name__ == "__main__":
+    main()
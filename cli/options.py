@@ -0,0 +1,163 @@
+# Command line options of `ja`. Kept apart from run.py so `ja --help` and
+# `ja --version` only load argparse.
+from argparse import SUPPRESS, ArgumentParser
+
+OUTPUT_FORMATS = ["table", "ndjson", "csv"]
+# --watch polls every WATCH_MIN_INTERVAL seconds after a change
+WATCH_MIN_INTERVAL = 15
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(prog="Dev Utils", description="Dev cli helper")
+    parser.add_argument(
+        "--verbose", "-v", help="Show more information", action="store_true"
+    )
+    parser.add_argument(
+        "--pr",
+        "-p",
+        help="Generate link to create a PR to be merged on the latest release branch",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--push",
+        help="will push your branch with set upstream ",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--rebase",
+        help="rebase current branch with the base branch",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--desc",
+        "-d",
+        help="Fetches the description from the ticket",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--open", "-o", help="Open jira ticket or pr in github", choices=["jira", "pr"]
+    )
+    parser.add_argument(
+        "--branch",
+        "-b",
+        help="List the available branches and checkout",
+        nargs="?",
+        const="*",
+    )
+    parser.add_argument(
+        "--comments",
+        help="Show at most N comments with --desc (0 skips them)",
+        type=int,
+        metavar="N",
+    )
+    parser.add_argument(
+        "--pager", help="Send --desc through $PAGER (less)", action="store_true"
+    )
+    parser.add_argument(
+        "--workspace",
+        "-w",
+        help="Run an action on every repo of the workspace in parallel",
+        choices=["status", "fetch", "rebase", "push"],
+    )
+    parser.add_argument("--new", help="Start a new ticket", action="store_true")
+    parser.add_argument("--all", "-a", help="All", action="store_true")
+    parser.add_argument(
+        "--jira_ticket",
+        "-j",
+        help="specify the jira ticket to avoid reading the branch name",
+    )
+    parser.add_argument("--save-session", "-s", help="Save jira session cookie")
+    parser.add_argument(
+        "--update", "-u", help="Update dev-utils repo", action="store_true"
+    )
+    parser.add_argument(
+        "--create", help="Create a new jira ticket", action="store_true"
+    )
+    parser.add_argument(
+        "--transition",
+        help="Move tickets (default: the branch ticket) to STATUS, e.g. 'In Review'",
+        nargs="+",
+        metavar=("STATUS", "KEY"),
+    )
+    parser.add_argument("--jql", help="Select the tickets for --transition with jql")
+    parser.add_argument("--search", help="Search jira tickets", action="store_true")
+    parser.add_argument(
+        "--title",
+        help="Title filter for --search, skips the prompts ('!' negates it)",
+    )
+    parser.add_argument("--epic", help="Epic filter for --search, skips its prompt")
+    parser.add_argument("--sprint", help="Sprint of --create, skips its prompt")
+    parser.add_argument(
+        "--list",
+        help="List the sprints or epics of the board",
+        choices=["sprints", "epics"],
+    )
+    parser.add_argument(
+        "--output",
+        help="Output format of --search and --list, ndjson/csv stream as pages arrive",
+        choices=OUTPUT_FORMATS,
+        default="table",
+    )
+    parser.add_argument(
+        "--sync",
+        help="Sync the local issue index used by --search",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch",
+        help="Print changes to the active sprint as they happen, polling at "
+        f"least every SECONDS (default {WATCH_MIN_INTERVAL})",
+        nargs="?",
+        const=WATCH_MIN_INTERVAL,
+        type=float,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--completion",
+        help="Print the completion script, e.g. `source <(ja --completion bash)`",
+        choices=["bash", "zsh"],
+    )
+    parser.add_argument(
+        "--refresh-completions", help=SUPPRESS, action="store_true"
+    )
+    parser.add_argument(
+        "--install-hook",
+        help="Install a post-checkout hook that prefetches the ticket",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--prefetch",
+        help="Fetch the current ticket into the cache (used by the hook)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--live", help="Search jira instead of the local index", action="store_true"
+    )
+    parser.add_argument(
+        "--no-cache", help="Do not read or write the jira cache", action="store_true"
+    )
+    parser.add_argument(
+        "--refresh",
+        help="Ignore cached jira responses and store fresh ones",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--daemon",
+        help="Manage the background daemon that keeps ja warm",
+        choices=["start", "stop", "status", "serve"],
+    )
+    parser.add_argument(
+        "--no-daemon", help="Run in-process even if a daemon is up", action="store_true"
+    )
+    parser.add_argument(
+        "--timings",
+        help="Print where the time went when the command ends",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--trace",
+        help="Write a chrome trace (chrome://tracing) of http calls and subprocesses",
+        metavar="OUT.json",
+    )
+    parser.add_argument("--version", action="version", version="%(prog)s 0.4.2")
+    return parser
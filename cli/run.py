@@ -1,24 +1,25 @@
 #!/usr/bin/env python
 from argparse import ArgumentParser, Namespace
-from dataclasses import dataclass
-from datetime import datetime
-from emoji import emojize
+from client import CACHE_DIR, DAEMON_PID, DAEMON_SOCKET, RUN_PATH, code_version
+from options import build_parser
+from collections import OrderedDict, deque
+from contextlib import closing
+from dataclasses import dataclass, field
+from functools import lru_cache
 from termcolor import colored
-from typing import Optional, Tuple, Dict, List
+from typing import Any, Callable, Optional, Tuple, Dict, List, Iterator
 import json
 import urllib
 import argparse
-import inquirer
 import os
 import re
-import requests as r
+import shlex
+import shutil
 import signal
 import subprocess
 import sys
-import urllib3
-import yaml
-
-urllib3.disable_warnings()
+import threading
+import time
 
 
 @dataclass
@@ -40,20 +41,144 @@ class TStatuses:
 
 T = TStatuses()
 
-g_has_gum = (
-    subprocess.run(["which", "gum"], stdout=subprocess.PIPE, text=True).stdout.strip()
-    != ""
-)
-g_has_glow = (
-    subprocess.run(["which", "glow"], stdout=subprocess.PIPE, text=True).stdout.strip()
-    != ""
-)
+
+@lru_cache(maxsize=None)
+def has_tool(name: str) -> bool:
+    return shutil.which(name) is not None
+
+
+class LazyPattern:
+    """A regex compiled on first use, so importing run.py (e.g. for a daemon
+    forward or a completion refresh) does not compile every pattern"""
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.args = (pattern, flags)
+
+    def __getattr__(self, name: str):
+        # match/search/sub are bound once, later calls skip this hook
+        value = getattr(re.compile(*self.args), name)
+        setattr(self, name, value)
+        return value
+
+
+class Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self, time.perf_counter())
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+@dataclass
+class Tracer:
+    enabled: bool = False
+    started_at: float = 0.0
+    events: List[tuple] = field(default_factory=list)
+    # phases printed by --timings, in this order
+    phases = ["config", "imports", "http", "subprocess", "render"]
+
+    def configure(self, args: Namespace) -> None:
+        self.enabled = bool(args.timings or args.trace)
+        self.started_at = time.perf_counter()
+        self.events = []
+
+    def span(self, name: str, cat: str, **args):
+        # disabled tracing hands out one shared no-op span
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, cat, args)
+
+    def record(self, span: Span, end: float) -> None:
+        # list.append is atomic, spans can end on any thread
+        self.events.append(
+            (span.name, span.cat, span.start, end, threading.get_ident(), span.args)
+        )
+
+    def report(self, args: Namespace) -> None:
+        if not self.enabled:
+            return
+        if args.trace:
+            self.write_trace(args.trace)
+        if args.timings:
+            self.print_timings()
+        self.enabled = False
+
+    def print_timings(self):
+        wall = (time.perf_counter() - self.started_at) * 1000
+        totals: Dict[str, List[float]] = {}
+        for (_, cat, start, end, _, _) in self.events:
+            total = totals.setdefault(cat, [0.0, 0])
+            total[0] += (end - start) * 1000
+            total[1] += 1
+        # spans overlap (parallel requests, imports inside a request), so the
+        # phases do not add up to the wall time
+        lines = [f"\ntimings: wall [{colored(f'{wall:.1f}ms', 'yellow')}]"]
+        for cat in self.phases + sorted(set(totals) - set(self.phases)):
+            if cat not in totals:
+                continue
+            (ms, count) = totals[cat]
+            lines.append(f"  {cat.ljust(11)} {ms:>9.1f}ms  x{count}")
+        sys.stderr.write("\n".join(lines) + "\n")
+
+    def write_trace(self, path: str):
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round((start - self.started_at) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            }
+            for (name, cat, start, end, tid, args) in self.events
+        ]
+        with open(path, "w") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+
+
+TRACER = Tracer()
 
 
 @dataclass
 class Env:
     environment: Dict[str, str]
     VERSION: str = "v0.2.0"
+    # fingerprint of the environment as last read or written, see save_config
+    saved: Optional[str] = None
 
     @property
     def jira_host(self):
@@ -83,6 +208,30 @@ class Env:
     def jira_active_sprint_id(self):
         return self.environment.get("jira").get("active_sprint_id")
 
+    @property
+    def jira_pool_size(self):
+        return int(self.environment.get("jira").get("pool_size", 10))
+
+    @property
+    def jira_timeout(self):
+        return float(self.environment.get("jira").get("timeout", 15))
+
+    @property
+    def jira_retries(self):
+        return int(self.environment.get("jira").get("retries", 3))
+
+    @property
+    def jira_workers(self):
+        return int(self.environment.get("jira").get("workers", 6))
+
+    @property
+    def jira_rate_limit(self):
+        return float(self.environment.get("jira").get("rate_limit", 0))
+
+    @property
+    def jira_burst(self):
+        return int(self.environment.get("jira").get("burst", 10))
+
     @property
     def github_host(self):
         return self.environment.get("github").get("host")
@@ -92,6 +241,8 @@ class Env:
         branches = self.environment.get("github").get("main_branch")
         if "," not in branches:
             return branches
+        import inquirer
+
         branches = branches.split(",")
         questions = [
             inquirer.List(
@@ -108,6 +259,42 @@ class Env:
     def github_repo(self):
         return self.environment.get("github").get("repo")
 
+    @property
+    def workspace_root(self):
+        root = (self.environment.get("workspace") or {}).get("root")
+        return os.path.expanduser(root) if root else None
+
+    @property
+    def workspace_repos(self) -> List[str]:
+        repos = (self.environment.get("workspace") or {}).get("repos") or []
+        return [os.path.expanduser(repo) for repo in repos]
+
+    @property
+    def cache_dir(self):
+        return (self.environment.get("cache") or {}).get("dir") or CACHE_DIR
+
+    @property
+    def board_max_age(self):
+        cache = self.environment.get("cache") or {}
+        return int(cache.get("board_max_age", BOARD_MAX_AGE))
+
+    @property
+    def index_path(self):
+        return f"{self.cache_dir}/issues.db"
+
+    @property
+    def cache_max_bytes(self):
+        max_mb = (self.environment.get("cache") or {}).get("max_mb", 50)
+        return int(float(max_mb) * 1024 * 1024)
+
+    @property
+    def cache_ttls(self):
+        overrides = (self.environment.get("cache") or {}).get("ttl") or {}
+        return [
+            (name, pattern, int(overrides.get(name, ttl)))
+            for (name, pattern, ttl) in CACHE_TTLS
+        ]
+
     def set_session(self, value):
         self.environment["jira"]["session"] = value
 
@@ -127,11 +314,52 @@ class Env:
         self.environment["jira"]["active_sprint_id"] = value
 
     def __str__(self):
-        return yaml.dump(self.environment, Dumper=yaml.Dumper, sort_keys=False)
+        import yaml
+
+        dumper = getattr(yaml, "CDumper", yaml.Dumper)
+        return yaml.dump(self.environment, Dumper=dumper, sort_keys=False)
 
 
 HOME = os.environ["HOME"]
+SHELL_TIMEOUT = 300
+PREFETCH_TIMEOUT = 5
+# a ticket prefetched within this window is not fetched again
+PREFETCH_WINDOW = 60
+COMMENTS_PAGE_SIZE = 50
+KEYS_PER_QUERY = 200
+# ndjson/csv are flushed every this many records, about a page of results
+FLUSH_EVERY = 100
+BOARD_COLUMNS = {
+    "sprint": ["id", "name", "state", "startDate", "endDate"],
+    "epic": ["id", "key", "name", "summary", "done"],
+}
+STREAM_CHUNK_SIZE = 64 * 1024
+# transitions per issue type and status rarely change, a stale entry is
+# refreshed when jira rejects it
+WORKFLOW_TTL = 24 * 60 * 60
+# --watch slows down to WATCH_MAX_INTERVAL while the sprint is quiet
+WATCH_MAX_INTERVAL = 300
+# a 429/503 asking to wait longer than this is reported instead of retried
+MAX_RETRY_WAIT = 60
 GLOBAL_CONFIG_PATH = f"{HOME}/.jarc.yml"
+# parsed ~/.jarc.yml as json, valid while the yaml file's mtime and size match
+CONFIG_SNAPSHOT_PATH = f"{CACHE_DIR}/config.json"
+# (name, endpoint pattern, ttl in seconds), first match wins, 0 disables caching
+CACHE_TTLS = [
+    ("transitions", LazyPattern(r"^/rest/api/2/issue/[^/?]+/transitions"), 0),
+    ("comments", LazyPattern(r"^/rest/api/2/issue/[^/?]+/comment"), 300),
+    ("issue", LazyPattern(r"^/rest/api/2/issue/[^/?]+"), 300),
+    ("sprint_issues", LazyPattern(r"^/rest/agile/1.0/board/\d+/sprint/\d+/issue"), 60),
+]
+# ResponseCache file names, `{group}-{sha1}.json`
+RESPONSE_ENTRY = LazyPattern(r"^(issue-[\w-]+|misc)-[0-9a-f]{40}\.json$")
+# sprint and epic lists are kept by BoardStore and refreshed in the background
+# once they are older than this
+BOARD_MAX_AGE = 3600
+# shell completion reads candidate files, a run after this many seconds
+# refreshes them in a detached process
+COMPLETION_MAX_AGE = 3600
+COMPLETION_TICKETS = 2000
 
 
 def get_env(args: Namespace) -> Env:
@@ -145,78 +373,622 @@ def get_env(args: Namespace) -> Env:
             "user_id": "",
             "board_id": "",
             "active_sprint_id": "",
+            "pool_size": 10,
+            "timeout": 15,
+            "retries": 3,
+            "workers": 6,
+            "rate_limit": 0,
+            "burst": 10,
         },
         "github": {"host": "github.com", "main_branch": "main", "repo": ""},
     }
 
-    if os.path.isfile(GLOBAL_CONFIG_PATH):
-        with open(GLOBAL_CONFIG_PATH) as fh:
-            result = yaml.load(fh, yaml.Loader)
+    with TRACER.span("get_env", "config", path=GLOBAL_CONFIG_PATH):
+        stat = config_stat()
+        if stat:
+            result = load_config(stat)
             if result:
                 env = result
-    else:
-        print(colored(f"No config file found at {GLOBAL_CONFIG_PATH}", "yellow"))
-    return Env(env)
+        else:
+            print(colored(f"No config file found at {GLOBAL_CONFIG_PATH}", "yellow"))
+    return Env(env, saved=config_fingerprint(env))
+
+
+def config_stat() -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(GLOBAL_CONFIG_PATH)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def config_fingerprint(environment: dict) -> str:
+    return json.dumps(environment, sort_keys=True, default=str)
+
+
+def load_config(stat: Tuple[int, int]) -> Optional[dict]:
+    try:
+        with open(CONFIG_SNAPSHOT_PATH) as fh:
+            snapshot = json.load(fh)
+        if tuple(snapshot["stat"]) == stat:
+            return snapshot["environment"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    with TRACER.span("yaml", "imports"):
+        import yaml
+
+    with open(GLOBAL_CONFIG_PATH) as fh:
+        environment = yaml.load(fh, getattr(yaml, "CLoader", yaml.Loader))
+    # only snapshot what we read if nobody rewrote the file meanwhile
+    if environment and config_stat() == stat:
+        write_snapshot(environment, stat)
+    return environment
+
+
+def write_snapshot(environment: dict, stat: Optional[Tuple[int, int]]) -> None:
+    if stat is None:
+        return
+    try:
+        text = json.dumps({"stat": stat, "environment": environment})
+        write_atomic(CONFIG_SNAPSHOT_PATH, text)
+    except (OSError, TypeError, ValueError):
+        # values json can not hold (e.g. yaml dates) just skip the snapshot
+        pass
+
+
+def save_config(env: Env) -> bool:
+    fingerprint = config_fingerprint(env.environment)
+    if fingerprint == env.saved and os.path.isfile(GLOBAL_CONFIG_PATH):
+        return False
+    write_atomic(GLOBAL_CONFIG_PATH, f"{env}", mode=0o600)
+    env.saved = fingerprint
+    write_snapshot(env.environment, config_stat())
+    return True
+
+
+def write_atomic(path: str, text: str, mode: Optional[int] = None) -> None:
+    import tempfile
+
+    # readers see either the old or the new file, never a partial one. A
+    # symlink (a dotfiles repo) is resolved so its target is the one replaced
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    (fd, tmp_path) = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(text)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        elif mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def run_command(parser: ArgumentParser, args: Namespace, env: Env, jira: "JiraApi"):
+    jira.configure(args)
+    try:
+        cli = Cli(args, env, jira)
+        cli.run(parser)
+    finally:
+        jira.boards.wait()
+        if not args.refresh_completions and jira.completions.is_stale():
+            jira.completions.claim()
+            spawn_ja(["--refresh-completions"])
+        if args.verbose:
+            jira.print_connection_stats()
+        TRACER.report(args)
 
 
 def main():
-    parser = argparse.ArgumentParser(prog="Dev Utils", description="Dev cli helper")
-    parser.add_argument(
-        "--verbose", "-v", help="Show more information", action="store_true"
-    )
-    parser.add_argument(
-        "--pr",
-        "-p",
-        help="Generate link to create a PR to be merged on the latest release branch",
-        action="store_true",
-    )
-    parser.add_argument(
-        "--push",
-        help="will push your branch with set upstream ",
-        action="store_true",
-    )
-    parser.add_argument(
-        "--rebase",
-        help="rebase current branch with the base branch",
-        action="store_true",
-    )
-    parser.add_argument(
-        "--desc",
-        "-d",
-        help="Fetches the description from the ticket",
-        action="store_true",
-    )
-    parser.add_argument(
-        "--open", "-o", help="Open jira ticket or pr in github", choices=["jira", "pr"]
-    )
-    parser.add_argument(
-        "--branch",
-        "-b",
-        help="List the available branches and checkout",
-        nargs="?",
-        const="*",
-    )
-    parser.add_argument("--new", help="Start a new ticket", action="store_true")
-    parser.add_argument("--all", "-a", help="All", action="store_true")
-    parser.add_argument(
-        "--jira_ticket",
-        "-j",
-        help="specify the jira ticket to avoid reading the branch name",
-    )
-    parser.add_argument("--save-session", "-s", help="Save jira session cookie")
-    parser.add_argument(
-        "--update", "-u", help="Update dev-utils repo", action="store_true"
-    )
-    parser.add_argument(
-        "--create", help="Create a new jira ticket", action="store_true"
-    )
-    parser.add_argument("--search", help="Search jira tickets", action="store_true")
-    parser.add_argument("--version", action="version", version="%(prog)s 0.4.2")
+    parser = build_parser()
     args = parser.parse_args()
+    if args.daemon:
+        daemon_command(args.daemon, parser, args)
+        return
+    TRACER.configure(args)
     env = get_env(args)
     jira = JiraApi(env, args)
-    cli = Cli(args, env, jira)
-    cli.run(parser)
+    run_command(parser, args, env, jira)
+
+
+@dataclass
+class ResponseCache:
+    path: str
+    max_bytes: int
+    ttls: list
+    read: bool = True
+    write: bool = True
+    memory: OrderedDict = field(default_factory=OrderedDict)
+    memory_size = 256
+    # bytes on disk, scanned once and then counted up by store() until evict
+    # rescans, so a paginated run does not stat the whole cache per page
+    size: Optional[int] = None
+    # memory and size are shared by the paginator and prefetch threads
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def ttl_for(self, endpoint: str) -> int:
+        for (_, pattern, ttl) in self.ttls:
+            if pattern.search(endpoint):
+                return ttl
+        return 0
+
+    def group_for(self, endpoint: str) -> str:
+        result = re.search(r"^/rest/api/2/issue/([^/?]+)", endpoint)
+        if result:
+            return "issue-" + re.sub(r"[^\w-]", "_", result.group(1))
+        return "misc"
+
+    def entry_path(self, host: str, endpoint: str) -> str:
+        import hashlib
+
+        digest = hashlib.sha1(f"{host}{endpoint}".encode()).hexdigest()
+        return f"{self.path}/{self.group_for(endpoint)}-{digest}.json"
+
+    def load(self, host: str, endpoint: str) -> Optional[dict]:
+        if not self.read:
+            return None
+        path = self.entry_path(host, endpoint)
+        with self.lock:
+            remembered = self.memory.get(path)
+        # the file wins over memory once another process (a daemon fork, a
+        # --no-daemon run) replaced or invalidated it
+        if remembered is not None and remembered[1] == file_stamp(path):
+            with self.lock:
+                if path in self.memory:
+                    self.memory.move_to_end(path)
+            return remembered[0]
+        try:
+            with open(path) as fh:
+                entry = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        self.remember(path, entry, file_stamp(path))
+        return entry
+
+    def remember(self, path: str, entry: dict, stamp: Optional[int]) -> None:
+        with self.lock:
+            self.memory[path] = (entry, stamp)
+            self.memory.move_to_end(path)
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+
+    def is_fresh(self, entry: dict, ttl: int) -> bool:
+        return time.time() - entry.get("stored_at", 0) < ttl
+
+    def store(self, host: str, endpoint: str, body, headers) -> None:
+        if not self.write:
+            return
+        entry = {
+            "endpoint": endpoint,
+            "stored_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body": body,
+        }
+        path = self.entry_path(host, endpoint)
+        text = json.dumps(entry)
+        try:
+            write_atomic(path, text)
+        except OSError:
+            self.remember(path, entry, None)
+            return
+        self.remember(path, entry, file_stamp(path))
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for (_, size, _) in self.entries())
+            else:
+                # overwrites count twice, that only makes the next rescan earlier
+                self.size += len(text)
+            full = self.size > self.max_bytes
+        if full:
+            self.evict()
+
+    def invalidate(self, endpoint: str) -> None:
+        group = self.group_for(endpoint)
+        if group == "misc":
+            return
+        with self.lock:
+            for path in [p for p in self.memory if f"/{group}-" in p]:
+                del self.memory[path]
+        if not os.path.isdir(self.path):
+            return
+        for item in os.scandir(self.path):
+            if item.name.startswith(f"{group}-"):
+                try:
+                    os.remove(item.path)
+                except OSError:
+                    pass
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        # only response entries, the cache dir also holds config.json,
+        # workflows.json and other files that are not ours to evict
+        entries = []
+        for item in os.scandir(self.path):
+            if not RESPONSE_ENTRY.match(item.name):
+                continue
+            try:
+                stat = item.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, item.path))
+        return entries
+
+    def evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for (_, size, _) in entries)
+        removed = []
+        if total > self.max_bytes:
+            entries.sort()
+            for (_, size, path) in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                removed.append(path)
+                total -= size
+        with self.lock:
+            for path in removed:
+                self.memory.pop(path, None)
+            self.size = total
+
+
+def file_stamp(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass
+class IssueIndex:
+    path: str
+    fields = "summary,status,assignee,customfield_10006,customfield_10003,updated"
+    # jql dates are in the jira user's timezone, re-fetching a day of updates
+    # covers any offset between it and this machine
+    overlap_seconds = 24 * 60 * 60
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def connect(self):
+        # sqlite3's own context manager only commits, callers wrap it in
+        # closing() too so no connection outlives its command in the daemon
+        import sqlite3
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS issues (
+                key TEXT PRIMARY KEY,
+                summary TEXT,
+                status TEXT,
+                assignee TEXT,
+                points REAL,
+                epic TEXT,
+                updated TEXT
+            );
+            CREATE INDEX IF NOT EXISTS issues_epic ON issues (epic);
+            CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts
+                USING fts5(key, summary, content='issues', content_rowid='rowid');
+            CREATE TRIGGER IF NOT EXISTS issues_ai AFTER INSERT ON issues BEGIN
+                INSERT INTO issues_fts (rowid, key, summary)
+                VALUES (new.rowid, new.key, new.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS issues_ad AFTER DELETE ON issues BEGIN
+                INSERT INTO issues_fts (issues_fts, rowid, key, summary)
+                VALUES ('delete', old.rowid, old.key, old.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS issues_au AFTER UPDATE ON issues BEGIN
+                INSERT INTO issues_fts (issues_fts, rowid, key, summary)
+                VALUES ('delete', old.rowid, old.key, old.summary);
+                INSERT INTO issues_fts (rowid, key, summary)
+                VALUES (new.rowid, new.key, new.summary);
+            END;
+            """
+        )
+        return db
+
+    def last_sync(self) -> Optional[float]:
+        if not self.exists():
+            return None
+        with closing(self.connect()) as db, db:
+            query = "SELECT value FROM meta WHERE name = 'last_sync'"
+            row = db.execute(query).fetchone()
+        return float(row[0]) if row else None
+
+    def last_sync_label(self) -> str:
+        last_sync = self.last_sync()
+        if last_sync is None:
+            return "never"
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(last_sync))
+
+    def sync(self, jira: "JiraApi", project_key: str) -> int:
+        started = time.time()
+        last_sync = self.last_sync()
+        jql = f"project = {project_key}"
+        if last_sync:
+            since = time.strftime(
+                "%Y/%m/%d %H:%M",
+                time.localtime(last_sync - self.overlap_seconds),
+            )
+            jql += f' AND updated >= "{since}"'
+        jql = urllib.parse.quote(f"{jql} ORDER BY updated ASC")  # type: ignore
+        endpoint = f"/rest/api/2/search?jql={jql}&fields={self.fields}"
+        count = 0
+        with closing(self.connect()) as db, db:
+            batch = []
+            issues = jira.paginate(endpoint, "issues", 100, convert=Issue.from_json)
+            for issue in issues:
+                batch.append(issue.index_row())
+                if len(batch) >= 500:
+                    count += self.upsert(db, batch)
+                    batch = []
+            count += self.upsert(db, batch)
+            db.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('last_sync', ?)",
+                (str(started),),
+            )
+        return count
+
+    def upsert(self, db, rows: List[tuple]) -> int:
+        db.executemany(
+            """
+            INSERT INTO issues (key, summary, status, assignee, points, epic, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                summary = excluded.summary,
+                status = excluded.status,
+                assignee = excluded.assignee,
+                points = excluded.points,
+                epic = excluded.epic,
+                updated = excluded.updated
+            """,
+            rows,
+        )
+        return len(rows)
+
+    def recent(self, limit: int) -> List["Issue"]:
+        query = (
+            "SELECT key, status, points, assignee, summary, epic, updated FROM issues"
+            " ORDER BY updated DESC LIMIT ?"
+        )
+        with closing(self.connect()) as db, db:
+            return [Issue(*row) for row in db.execute(query, (limit,))]
+
+    def search(self, summary: str, epic_link: Optional[str]) -> List["Issue"]:
+        query = (
+            "SELECT key, status, points, assignee, summary, epic, updated FROM issues"
+        )
+        conditions = []
+        params: List[str] = []
+        negate = summary.startswith("!")
+        words = re.findall(r"\w+", summary[1:] if negate else summary)
+        if words:
+            match = " AND ".join(f'"{w}"*' for w in words)
+            conditions.append(
+                f"rowid {'NOT IN' if negate else 'IN'} "
+                "(SELECT rowid FROM issues_fts WHERE issues_fts MATCH ?)"
+            )
+            params.append(match)
+        if epic_link:
+            conditions.append("epic = ?")
+            params.append(epic_link)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY updated DESC"
+        with closing(self.connect()) as db, db:
+            return [Issue(*row) for row in db.execute(query, params)]
+
+
+@dataclass
+class Issue:
+    """The handful of issue fields ja reads, without the rest of the payload"""
+
+    __slots__ = ("key", "status", "points", "assignee", "summary", "epic", "updated")
+    key: str
+    status: str
+    points: Optional[float]
+    assignee: Optional[str]
+    summary: Optional[str]
+    epic: Optional[str]
+    updated: Optional[str]
+
+    @classmethod
+    def from_json(cls, issue: dict) -> "Issue":
+        fields = issue.get("fields") or {}
+        return cls(
+            issue.get("key"),
+            (fields.get("status") or {}).get("name"),
+            fields.get("customfield_10006"),
+            (fields.get("assignee") or {}).get("displayName"),
+            fields.get("summary"),
+            fields.get("customfield_10003"),
+            fields.get("updated"),
+        )
+
+    def row(self) -> tuple:
+        return (self.status, self.key, self.points, self.assignee, self.summary)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def index_row(self) -> tuple:
+        return (
+            self.key,
+            self.summary,
+            self.status,
+            self.assignee,
+            self.points,
+            self.epic,
+            self.updated,
+        )
+
+
+@dataclass
+class SprintWatch:
+    """Sprint issues kept in memory and updated with `updated >=` polls"""
+
+    jira: "JiraApi"
+    sprint_id: int
+    min_interval: float
+    max_interval: float = WATCH_MAX_INTERVAL
+    fields = "summary,status,assignee,customfield_10006"
+    issues: Dict[str, Issue] = field(default_factory=dict)
+    interval: float = 0.0
+    polled_at: float = 0.0
+
+    def load(self) -> List[Issue]:
+        self.polled_at = time.time()
+        jql = f"sprint = {self.sprint_id}"
+        issues = self.jira.search_issues(jql, self.fields, Issue.from_json)
+        self.issues = {issue.key: issue for issue in issues}
+        self.interval = self.min_interval
+        return list(self.issues.values())
+
+    def poll(self) -> List[str]:
+        # relative dates do not depend on the jira user's timezone, the extra
+        # minutes cover jira's minute resolution; already seen rows are no-ops
+        started = time.time()
+        minutes = int((started - self.polled_at) // 60) + 2
+        jql = f'sprint = {self.sprint_id} AND updated >= "-{minutes}m"'
+        changes = []
+        for issue in self.jira.search_issues(jql, self.fields, Issue.from_json):
+            changes += issue_changes(self.issues.get(issue.key), issue)
+            self.issues[issue.key] = issue
+        # a ticket moved out of the sprint no longer matches the query above,
+        # only the sprint's current keys show it is gone
+        jql = f"sprint = {self.sprint_id}"
+        keys = set(self.jira.search_issues(jql, "key", lambda issue: issue["key"]))
+        for key in sorted(set(self.issues) - keys):
+            changes += issue_removed(self.issues.pop(key))
+        self.polled_at = started
+        # quiet sprints are polled less and less often, any change resets it
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 1.5, self.max_interval)
+        return changes
+
+    def backoff(self) -> None:
+        self.interval = min(self.interval * 2, self.max_interval)
+
+
+def issue_changes(before: Optional[Issue], after: Issue) -> List[str]:
+    label = after.key.ljust(13)
+    if before is None:
+        return [f"{label} {colored('new', 'green')} [{after.status}] {after.summary}"]
+    changes = []
+    for (name, old, new) in (
+        ("status", before.status, after.status),
+        ("assignee", before.assignee or "-", after.assignee or "-"),
+        ("points", before.points, after.points),
+    ):
+        if old != new:
+            changes.append(f"{label} {name}: {old} -> {colored(str(new), 'yellow')}")
+    return changes
+
+
+def issue_removed(before: Issue) -> List[str]:
+    label = before.key.ljust(13)
+    return [f"{label} {colored('removed', 'red')} [{before.status}] {before.summary}"]
+
+
+def sort_by_status(rows: List[tuple]) -> List[tuple]:
+    order = {
+        "Rejected": 0,
+        "To Do": 1,
+        "To Develop": 2,
+        "In Progress": 3,
+        "In Review": 4,
+        "In Test": 5,
+        "Done": 6,
+    }
+    return sorted(rows, key=lambda row: order.get(row[0], len(order)))
+
+
+def ask(message: str) -> str:
+    # like input() but the prompt goes to stderr, and a closed stdin answers ""
+    sys.stderr.write(message)
+    sys.stderr.flush()
+    try:
+        return input()
+    except EOFError:
+        return ""
+
+
+def write_records(records: Iterator[dict], columns: List[str], output: str) -> int:
+    """Writes ndjson or csv to stdout as records arrive. Stops quietly once the
+    reader (head, jq) goes away instead of fetching the remaining pages."""
+    out = sys.stdout
+    count = 0
+    try:
+        if output == "csv":
+            import csv
+
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(columns)
+            for record in records:
+                writer.writerow([record.get(column) for column in columns])
+                count += 1
+                if count % FLUSH_EVERY == 0:
+                    out.flush()
+        else:
+            encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+            for record in records:
+                out.write(encode({column: record.get(column) for column in columns}))
+                out.write("\n")
+                count += 1
+                if count % FLUSH_EVERY == 0:
+                    out.flush()
+        out.flush()
+    except BrokenPipeError:
+        # whatever is still buffered is flushed into /dev/null on exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, out.fileno())
+        os.close(devnull)
+    return count
+
+
+def print_search_rows(rows: Iterator[tuple], show_rejected: bool):
+    points = "points".ljust(6, " ")
+    summary = "summary"
+    status = "status".ljust(13, " ")
+    key = "key".ljust(13, " ")
+    who = "assignee".ljust(20, " ")
+    print(f"{status} | {key} | {points} | {who} | {summary}")
+
+    points = "---".ljust(6, "-")
+    summary = "---".ljust(107, "-")
+    status = "---".ljust(13, "-")
+    key = "---".ljust(13, "-")
+    who = "---".ljust(20, "-")
+    print(f"{status} | {key} | {points} | {who} | {summary}")
+
+    total_points = 0.0
+    for (status, key, points, who, summary) in rows:
+        if not show_rejected and status == "Rejected":
+            continue
+        total_points += float(points or 0.0)
+        status = status.ljust(13, " ")
+        points = str(points or "0.0").ljust(6, " ")
+        summary = (summary or "")[0:107].ljust(107, ".")
+        key = key.ljust(13, " ")
+        who = (who or "-").ljust(20, " ")[0:20]
+        print(f"{status} | {key} | {points} | {who} | {summary}")
+
+    print()
+    print(f"total points: {total_points}")
 
 
 def get_branch(args: Namespace) -> str:
@@ -228,52 +1000,335 @@ def get_branch(args: Namespace) -> str:
     return branch
 
 
-def shell(cmd: str, cwd=None, err_exit=False):
-    result = subprocess.Popen(
-        cmd.split(" "), stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd
+@dataclass
+class ProcessResult:
+    cmd: List[str]
+    code: int
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.code == 0 and not self.timed_out
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.ok:
+            return None
+        if self.timed_out:
+            return f"`{' '.join(self.cmd)}` timed out after {self.duration:.0f}s"
+        return self.stderr or f"`{' '.join(self.cmd)}` exited with {self.code}"
+
+
+def run_process(cmd, cwd=None, timeout=SHELL_TIMEOUT, stream=False) -> ProcessResult:
+    argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    with TRACER.span(" ".join(argv), "subprocess", cwd=cwd) as span:
+        result = spawn_process(argv, cwd, timeout, stream)
+        span.set(code=result.code, timed_out=result.timed_out)
+    return result
+
+
+def spawn_process(argv: List[str], cwd, timeout, stream) -> ProcessResult:
+    start = time.perf_counter()
+    # background and workspace runs get a session of their own and no stdin, a
+    # streamed command stays in the foreground so git can prompt on the
+    # terminal (ssh passphrases, credentials) and ctrl-c reaches it
+    try:
+        process = subprocess.Popen(
+            argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=None if stream else subprocess.DEVNULL,
+            cwd=cwd,
+            start_new_session=not stream,
+        )
+    except OSError as e:
+        return ProcessResult(argv, 127, "", str(e), time.perf_counter() - start)
+
+    # both pipes are drained at the same time so neither can fill up and block
+    # the child, with stream=True lines are echoed as they arrive
+    chunks: Dict[str, List[bytes]] = {"stdout": [], "stderr": []}
+
+    def drain(pipe, name, echo):
+        for line in iter(pipe.readline, b""):
+            chunks[name].append(line)
+            if echo:
+                echo.write(line.decode(errors="replace"))
+                echo.flush()
+        pipe.close()
+
+    readers = [
+        threading.Thread(
+            target=drain,
+            args=(process.stdout, "stdout", sys.stdout if stream else None),
+            daemon=True,
+        ),
+        threading.Thread(
+            target=drain,
+            args=(process.stderr, "stderr", sys.stderr if stream else None),
+            daemon=True,
+        ),
+    ]
+    for reader in readers:
+        reader.start()
+
+    def kill():
+        if stream:
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+
+    timed_out = False
+    try:
+        code = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        kill()
+        code = process.wait()
+    except BaseException:
+        # ctrl-c while waiting, the child must not outlive the command
+        kill()
+        process.wait()
+        raise
+    for reader in readers:
+        reader.join()
+    return ProcessResult(
+        argv,
+        code,
+        b"".join(chunks["stdout"]).decode(errors="replace").strip(),
+        b"".join(chunks["stderr"]).decode(errors="replace").strip(),
+        time.perf_counter() - start,
+        timed_out,
     )
-    stdout = result.stdout
-    if not stdout:
-        return ("Empty", None)
 
-    output = stdout.read().decode().strip()
-    error: Optional[str] = stdout.read().decode().strip()
-    error = None if error == "" else error
+
+def ahead_behind(
+    oids: Dict[str, str], base: str, cache_path: str
+) -> Dict[str, Tuple[int, int]]:
+    """Commits each branch is ahead/behind origin/base (or base), by oid"""
+    base_ref = f"origin/{base}"
+    process = run_process(f"git rev-parse --verify -q {base_ref}")
+    if not process.ok:
+        base_ref = base
+        process = run_process(f"git rev-parse --verify -q {base_ref}")
+    if not process.ok:
+        return {}
+    base_oid = process.stdout
+    try:
+        with open(cache_path) as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        cache = {}
+
+    counts = {}
+    missing = []
+    for (branch, oid) in oids.items():
+        cached = cache.get(f"{oid}..{base_oid}")
+        if cached:
+            counts[branch] = tuple(cached)
+        else:
+            missing.append(branch)
+    if missing:
+        counts.update(count_ahead_behind(missing, base_ref))
+
+    # only pairs of the current refs are kept
+    fresh = {
+        f"{oids[branch]}..{base_oid}": list(count)
+        for (branch, count) in counts.items()
+    }
+    if fresh != cache:
+        try:
+            write_atomic(cache_path, json.dumps(fresh))
+        except OSError:
+            pass
+    return counts
+
+
+def count_ahead_behind(
+    branches: List[str], base_ref: str
+) -> Dict[str, Tuple[int, int]]:
+    # git >= 2.41 answers for every ref in one for-each-ref
+    refs = " ".join(shlex.quote(f"refs/heads/{branch}") for branch in branches)
+    process = run_process(
+        "git for-each-ref "
+        f"--format='%(refname:short)%09%(ahead-behind:{base_ref})' {refs}"
+    )
+    counts = {}
+    if process.ok:
+        for line in process.stdout.split("\n"):
+            if not line:
+                continue
+            (branch, count) = line.split("\t")
+            (ahead, behind) = count.split()
+            counts[branch] = (int(ahead), int(behind))
+        return counts
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def count(branch):
+        cmd = ["git", "rev-list", "--left-right", "--count", f"{branch}...{base_ref}"]
+        return run_process(cmd)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for (branch, result) in zip(branches, pool.map(count, branches)):
+            if result.ok:
+                (ahead, behind) = result.stdout.split()
+                counts[branch] = (int(ahead), int(behind))
+    return counts
+
+
+def branch_labels(
+    branches: List[str], tickets: Dict[str, Issue], counts: Dict[str, Tuple[int, int]]
+) -> Dict[str, str]:
+    width = min(max(len(branch) for branch in branches), 60)
+    labels = {}
+    for branch in branches:
+        issue = tickets.get(branch_ticket(branch) or "")
+        columns = [branch.ljust(width)]
+        if issue:
+            points = issue.points
+            columns.append((issue.status or "-").ljust(12)[:12])
+            columns.append((issue.assignee or "-").ljust(16)[:16])
+            columns.append(f"({points if points is not None else '-'})".ljust(6))
+        elif tickets:
+            columns.append(" " * 36)
+        if branch in counts:
+            (ahead, behind) = counts[branch]
+            columns.append(f"+{ahead}/-{behind}")
+        labels["  ".join(columns).rstrip()] = branch
+    return labels
+
+
+def run_parallel(
+    cmds: List[str], cwd=None, timeout=SHELL_TIMEOUT
+) -> List[ProcessResult]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(cmds)) as pool:
+        futures = [pool.submit(run_process, cmd, cwd, timeout) for cmd in cmds]
+        return [future.result() for future in futures]
+
+
+# bash completion for ja; sprint/epic names and ticket keys come from the files
+# written by `ja --refresh-completions`, branches from git
+COMPLETION_SCRIPT = r"""_ja_candidates() {
+    local IFS=$'\n'
+    COMPREPLY=($(awk -F '\t' -v prefix="$2" \
+        'index(tolower($1), tolower(prefix)) == 1 { gsub(/ /, "\\ ", $1); print $1 }' \
+        "$1" 2>/dev/null))
+}
+
+_ja() {
+    local dir=@DIR@
+    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"
+    case "$prev" in
+        -j|--jira_ticket) _ja_candidates "$dir/tickets" "$cur" ;;
+        --sprint) _ja_candidates "$dir/sprints" "$cur" ;;
+        --epic) _ja_candidates "$dir/epics" "$cur" ;;
+        -b|--branch)
+            local IFS=$'\n'
+            COMPREPLY=($(git for-each-ref --format='%(refname:short)' \
+                "refs/heads/$cur*" "refs/heads/$cur*/**" 2>/dev/null)) ;;
+        -o|--open) COMPREPLY=($(compgen -W "jira pr" -- "$cur")) ;;
+        -w|--workspace) COMPREPLY=($(compgen -W "status fetch rebase push" -- "$cur")) ;;
+        --list) COMPREPLY=($(compgen -W "sprints epics" -- "$cur")) ;;
+        --output) COMPREPLY=($(compgen -W "table ndjson csv" -- "$cur")) ;;
+        --completion) COMPREPLY=($(compgen -W "bash zsh" -- "$cur")) ;;
+        *) COMPREPLY=($(compgen -W "@OPTIONS@" -- "$cur")) ;;
+    esac
+}
+
+complete -F _ja ja"""
+
+
+def spawn_ja(argv: List[str]) -> None:
+    # a detached ja that outlives this command, used for background refreshes
+    try:
+        subprocess.Popen(
+            [sys.executable, RUN_PATH, *argv, "--no-daemon"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def run_background(cmd: str, cwd=None, timeout=SHELL_TIMEOUT):
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(run_process, cmd, cwd, timeout)
+    pool.shutdown(wait=False)
+    return future
+
+
+def shell(cmd: str, cwd=None, err_exit=False, timeout=SHELL_TIMEOUT, stream=False):
+    result = run_process(cmd, cwd=cwd, timeout=timeout, stream=stream)
+    error = result.error
 
     if err_exit and error:
-        print(colored(error, "red"))
+        print(colored(error if not stream else f"`{cmd}` failed", "red"))
         exit(1)
 
     if err_exit and not error:
-        return output
+        return result.stdout
+
+    return (error, result.stdout)
+
 
-    return (error, output)
+HOOK_SHEBANG = LazyPattern(r"#!\s*\S*/(env\s+)?(ba)?sh(\s|$)")
+HOOK_MANAGERS = LazyPattern(r"husky|pre-commit|lefthook|overcommit", re.IGNORECASE)
 
 
-def get_ticket_from_branch(args: Namespace, env: Env) -> Tuple[str, str]:
+def appendable_hook(content: str) -> bool:
+    # lines appended to another interpreter's script, after a final exit or
+    # exec, or to a file a hook manager rewrites would break or never run
+    if not HOOK_SHEBANG.match(content) or HOOK_MANAGERS.search(content):
+        return False
+    lines = [line.strip() for line in content.splitlines()]
+    code = [line for line in lines if line and not line.startswith("#")]
+    return not code or code[-1].split()[0] not in ("exit", "exec")
+
+
+BRANCH_PATTERN = LazyPattern(r"(s[0-9]+\/)?([A-Z]+-[0-9]+)(-\w+)?")
+
+
+def normalize_ticket(value: str, env: Env) -> Optional[str]:
+    # CFCCON-12 stays as is, a one letter prefix or a bare number (j12, 12)
+    # uses the configured project key
+    ticket_regex = r"([a-zA-Z]+)?-?([0-9]+)"
+    ticket_pattern = re.compile(ticket_regex)
+    result = ticket_pattern.search(value)
+    if not result:
+        return None
+    prefix = result.group(1) or ""
+    project_key = env.jira_project_key if len(prefix) <= 1 else prefix.upper()
+    return f"{project_key}-{result.group(2)}"
+
+
+def branch_ticket(branch: str) -> Optional[str]:
+    result = BRANCH_PATTERN.search(branch)
+    return result.group(2) if result else None
+
+
+def get_ticket_from_branch(
+    args: Namespace, env: Env, branch: Optional[str] = None
+) -> Tuple[str, str]:
     if args.jira_ticket:
-        ticket_regex = r"([a-zA-Z]+)?-?([0-9]+)"
-        ticket_pattern = re.compile(ticket_regex)
-        result = ticket_pattern.search(args.jira_ticket)
-        if result and result.groups:
-            number = result.group(2)
-            if number:
-                sprint = None
-                project_key = (
-                    env.jira_project_key
-                    if len(result.group(1)) == 1
-                    else result.group(1)
-                )
-                ticket = f"{project_key}-{number}"
-                if args.verbose:
-                    print(f"sprint-number: [{colored(sprint, 'green')}]")
-                    print(f"ticket-id: [{colored(ticket, 'green')}]")
-                return (ticket, ticket)
-
-    branch = get_branch(args)
-    valid_branch_regex = r"(s[0-9]+\/)?([A-Z]+-[0-9]+)(-\w+)?"
-    branch_pattern = re.compile(valid_branch_regex)
-    result = branch_pattern.search(branch)
+        ticket = normalize_ticket(args.jira_ticket, env)
+        if ticket:
+            sprint = None
+            if args.verbose:
+                print(f"sprint-number: [{colored(sprint, 'green')}]")
+                print(f"ticket-id: [{colored(ticket, 'green')}]")
+            return (ticket, ticket)
+
+    branch = branch or get_branch(args)
+    result = BRANCH_PATTERN.search(branch)
     if not result:
         print(colored("Could not get details from your branch", "yellow"))
         exit(1)
@@ -286,6 +1341,551 @@ def get_ticket_from_branch(args: Namespace, env: Env) -> Tuple[str, str]:
     return (branch, ticket)
 
 
+@dataclass
+class RepoContext:
+    """The repo and machine facts a command needs, each looked up at most once
+    per run, also when read from worker threads"""
+
+    args: Namespace
+    env: Env
+    memo: Dict[str, Any] = field(default_factory=dict)
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def remember(self, name: str, compute: Callable[[], Any]):
+        with self.lock:
+            if name not in self.memo:
+                self.memo[name] = compute()
+            return self.memo[name]
+
+    @property
+    def branch(self) -> str:
+        return self.remember("branch", lambda: get_branch(self.args))
+
+    @property
+    def branch_ticket(self) -> Tuple[str, str]:
+        def compute():
+            # -j does not need the branch, otherwise it is read only once
+            branch = None if self.args.jira_ticket else self.branch
+            return get_ticket_from_branch(self.args, self.env, branch)
+
+        return self.remember("branch_ticket", compute)
+
+    @property
+    def system(self) -> str:
+        import platform
+
+        return self.remember("system", platform.system)
+
+    def tool(self, name: str) -> Optional[str]:
+        return self.remember(f"tool:{name}", lambda: shutil.which(name))
+
+    def warm(self, *names: str) -> None:
+        """Looks the named facts up now, e.g. while a request is in flight"""
+        for name in names:
+            getattr(self, name)
+
+    @property
+    def clipboard(self) -> Optional[List[str]]:
+        if self.system == "Darwin":
+            return ["pbcopy"] if self.tool("pbcopy") else None
+        if self.tool("xclip"):
+            return ["xclip", "-i", "-selection", "clipboard"]
+        return ["wl-copy"] if self.tool("wl-copy") else None
+
+    @property
+    def opener(self) -> Optional[str]:
+        name = "open" if self.system == "Darwin" else "xdg-open"
+        return name if self.tool(name) else None
+
+    def copy(self, text: str) -> bool:
+        cmd = self.clipboard
+        if cmd is None:
+            print(f"could not find a clipboard tool for your OS:[{self.system}]")
+            return False
+        try:
+            subprocess.run(cmd, input=text, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"could not copy to the clipboard error:[{e}]")
+            return False
+        return True
+
+    def open_link(self, link: str, press_enter_message=False) -> None:
+        if press_enter_message:
+            print(colored("\n[press enter to open in browser]", "blue"), end="")
+            input()
+        if self.opener is None:
+            print(
+                colored(
+                    f"could not find a browser opener for your OS:[{self.system}]",
+                    "yellow",
+                )
+            )
+            return
+        subprocess.run(
+            [self.opener, link], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+
+@dataclass
+class BoardStore:
+    """Sprint and epic lists per board, served stale while a thread refreshes"""
+
+    path: str
+    max_age: int
+    read: bool = True
+    write: bool = True
+    boards: Dict[str, dict] = field(default_factory=dict)
+    refreshing: set = field(default_factory=set)
+    threads: List[threading.Thread] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    on_update: Optional[Callable[[str, str, List[dict]], None]] = None
+
+    def board_path(self, board_id: str) -> str:
+        name = re.sub(r"[^\w-]", "_", str(board_id))
+        return f"{self.path}/{name}.json"
+
+    def load(self, board_id: str) -> dict:
+        with self.lock:
+            if board_id not in self.boards:
+                board = {}
+                try:
+                    with open(self.board_path(board_id)) as fh:
+                        board = json.load(fh)
+                except (OSError, ValueError):
+                    pass
+                self.boards[board_id] = board
+            return self.boards[board_id]
+
+    def get(
+        self, board_id: str, kind: str, fetch: Callable[[], List[dict]]
+    ) -> List[dict]:
+        values = self.peek(board_id, kind, fetch)
+        if values is None:
+            return self.update(board_id, kind, fetch())
+        return values
+
+    def peek(
+        self, board_id: str, kind: str, fetch: Callable[[], List[dict]]
+    ) -> Optional[List[dict]]:
+        entry = self.load(board_id).get(kind) if self.read else None
+        if entry is None:
+            return None
+        if time.time() - entry["stored_at"] > self.max_age:
+            self.refresh(board_id, kind, fetch)
+        return entry["values"]
+
+    def refresh(self, board_id: str, kind: str, fetch: Callable[[], List[dict]]):
+        with self.lock:
+            if (board_id, kind) in self.refreshing:
+                return
+            self.refreshing.add((board_id, kind))
+
+        def run():
+            try:
+                self.update(board_id, kind, fetch())
+            except SystemExit:
+                # a failed page already printed why, the stale list stays
+                pass
+            finally:
+                with self.lock:
+                    self.refreshing.discard((board_id, kind))
+
+        thread = threading.Thread(target=run, name=f"board-{kind}")
+        thread.start()
+        self.threads.append(thread)
+
+    def wait(self) -> None:
+        # a short command waits for its refreshes to land; this has to happen
+        # before interpreter shutdown, which stops new pool work in fetch()
+        while self.threads:
+            self.threads.pop().join()
+
+    def update(self, board_id: str, kind: str, values: List[dict]) -> List[dict]:
+        board = self.load(board_id)
+        with self.lock:
+            board[kind] = {"stored_at": time.time(), "values": values}
+            text = json.dumps(board) if self.write else None
+        if text is not None:
+            try:
+                write_atomic(self.board_path(board_id), text)
+            except OSError:
+                pass
+        if self.on_update:
+            self.on_update(board_id, kind, values)
+        return values
+
+
+@dataclass
+class Completions:
+    """Candidate files for the shell completion script, one line per candidate,
+    so completing never starts python or touches the network"""
+
+    path: str
+    board_id: str
+
+    def enabled(self) -> bool:
+        # the directory is created by `ja --completion`
+        return os.path.isdir(self.path)
+
+    def is_stale(self) -> bool:
+        if not self.enabled():
+            return False
+        try:
+            age = time.time() - os.stat(f"{self.path}/tickets").st_mtime
+        except OSError:
+            return True
+        return age > COMPLETION_MAX_AGE
+
+    def claim(self) -> None:
+        # marks the tickets fresh so concurrent runs do not all refresh them
+        with open(f"{self.path}/tickets", "a"):
+            os.utime(f"{self.path}/tickets")
+
+    def update(self, kind: str, lines: Iterator[str]) -> None:
+        if not self.enabled():
+            return
+        text = "".join(f"{line}\n" for line in lines)
+        path = f"{self.path}/{kind}"
+        try:
+            with open(path) as fh:
+                if fh.read() == text:
+                    os.utime(path)
+                    return
+        except OSError:
+            pass
+        try:
+            write_atomic(path, text)
+        except OSError:
+            pass
+
+    def board_updated(self, board_id: str, kind: str, values: List[dict]) -> None:
+        if str(board_id) != str(self.board_id):
+            return
+        if kind == "sprint":
+            names = (v["name"] for v in values if v.get("state") != "closed")
+            self.update("sprints", names)
+        elif kind == "epic":
+            self.update("epics", (v["name"] for v in values if v.get("name")))
+
+
+@dataclass
+class RateLimiter:
+    """Paces the requests of a JiraApi, shared by all its threads
+
+    A token bucket paces requests and a limit caps how many are in flight.
+    Both back off multiplicatively on 429/503 (or X-RateLimit-NearLimit) and
+    grow back additively with every good response, up to `max_rate` (0 means
+    no ceiling) and `max_concurrency`. Retry-After and X-RateLimit-Reset
+    pause every request until they pass, unless they are too far off to
+    retry (MAX_RETRY_WAIT).
+    """
+
+    max_rate: float
+    burst: int
+    max_concurrency: int
+    rate: float = 0.0
+    limit: float = 0.0
+    tokens: float = 0.0
+    updated: float = 0.0
+    in_flight: int = 0
+    paused_until: float = 0.0
+    decreased_at: float = 0.0
+    sent: deque = field(default_factory=lambda: deque(maxlen=32))
+    condition: threading.Condition = field(default_factory=threading.Condition)
+
+    def __post_init__(self):
+        self.rate = self.max_rate
+        self.limit = float(self.max_concurrency)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.rate:
+                    elapsed = now - self.updated
+                    self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+                self.updated = now
+                wait: Optional[float] = self.paused_until - now
+                if wait <= 0:
+                    if self.in_flight >= int(self.limit):
+                        wait = None
+                    elif self.rate and self.tokens < 1:
+                        wait = (1 - self.tokens) / self.rate
+                    else:
+                        self.tokens -= 1 if self.rate else 0
+                        self.in_flight += 1
+                        self.sent.append(now)
+                        return now
+                self.condition.wait(wait)
+
+    def decrease(self, started: float) -> None:
+        # requests sent before the last decrease saw the old pace, their
+        # 429s must not halve it again
+        if started < self.decreased_at:
+            return
+        self.decreased_at = time.monotonic()
+        self.limit = max(1.0, self.limit / 2)
+        observed = 0.0
+        if len(self.sent) > 1 and self.sent[-1] > self.sent[0]:
+            observed = (len(self.sent) - 1) / (self.sent[-1] - self.sent[0])
+        current = self.rate or observed
+        if current:
+            self.rate = max(0.5, current / 2)
+            self.tokens = min(self.tokens, 1.0)
+
+    def increase(self) -> None:
+        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        if self.rate and self.rate != self.max_rate:
+            self.rate += 1 / self.rate
+            if self.max_rate and self.rate > self.max_rate:
+                self.rate = self.max_rate
+
+    def release(
+        self, started: float, status: Optional[int], headers, attempt: int
+    ) -> float:
+        """Frees the slot and returns how long to wait before a retry"""
+        delay = 0.0
+        with self.condition:
+            self.in_flight -= 1
+            if status in (429, 503):
+                self.decrease(started)
+                backoff = 0.5 * 2**attempt
+                delay = retry_after(headers.get("Retry-After")) or backoff
+            elif headers.get("X-RateLimit-NearLimit") == "true":
+                self.decrease(started)
+            elif status is not None:
+                self.increase()
+            if headers.get("X-RateLimit-Remaining") == "0":
+                reset = retry_after(headers.get("X-RateLimit-Reset"))
+                delay = max(delay, reset or 0.0)
+            # past MAX_RETRY_WAIT the request gives up and the user is told to
+            # try later, pausing would only stall the next request silently
+            if delay and delay <= MAX_RETRY_WAIT:
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self.condition.notify_all()
+        return delay
+
+
+def retry_after(value: Optional[str]) -> Optional[float]:
+    # seconds, an epoch timestamp, an http date or an iso date
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        number = float(value)
+        return max(0.0, number - time.time() if number > 1e9 else number)
+    except ValueError:
+        pass
+    from datetime import datetime, timezone
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class TransitionResult:
+    key: str
+    ok: bool
+    message: str
+
+
+@dataclass
+class WorkflowCache:
+    """Transitions available per (issue type, status), read from any issue"""
+
+    path: str
+    ttl: int = WORKFLOW_TTL
+    read: bool = True
+    write: bool = True
+    workflows: Optional[dict] = None
+    fetched: set = field(default_factory=set)
+
+    def load(self) -> dict:
+        if self.workflows is None:
+            self.workflows = {}
+            try:
+                with open(self.path) as fh:
+                    self.workflows = json.load(fh)
+            except (OSError, ValueError):
+                pass
+        return self.workflows
+
+    def get(self, issue_type: str, status: str) -> Optional[List[dict]]:
+        # without read, only what this run fetched is used
+        key = f"{issue_type}|{status}"
+        if not self.read and key not in self.fetched:
+            return None
+        entry = self.load().get(key)
+        if not entry or time.time() - entry["stored_at"] > self.ttl:
+            return None
+        return entry["transitions"]
+
+    def put(self, issue_type: str, status: str, transitions: List[dict]) -> None:
+        entry = {"stored_at": time.time(), "transitions": transitions}
+        self.load()[f"{issue_type}|{status}"] = entry
+        self.fetched.add(f"{issue_type}|{status}")
+
+    def drop(self, issue_type: str, status: str) -> None:
+        self.load().pop(f"{issue_type}|{status}", None)
+
+    def save(self) -> None:
+        if not self.write or self.workflows is None:
+            return
+        try:
+            write_atomic(self.path, json.dumps(self.workflows))
+        except OSError:
+            pass
+
+
+def print_moves(results: List[TransitionResult], status: str) -> None:
+    for result in results:
+        label = colored("done", "green") if result.ok else colored("failed", "red")
+        print(f"{result.key.ljust(13)} [{label}] {result.message}")
+    if len(results) > 1:
+        moved = len([result for result in results if result.ok])
+        print(f"\nmoved {moved}/{len(results)} to {status}")
+
+
+def find_transition(transitions: List[dict], status: str) -> Optional[dict]:
+    status = status.lower()
+    for transition in transitions:
+        if (transition.get("to") or {}).get("name", "").lower() == status:
+            return transition
+    for transition in transitions:
+        if transition.get("name", "").lower() == status:
+            return transition
+    return None
+
+
+def convert_items(body, items: Optional[Tuple[str, Callable[[dict], Any]]]):
+    if items is None or body is None:
+        return body
+    (key, convert) = items
+    return {**body, key: [convert(item) for item in body.get(key) or []]}
+
+
+JSON_SPACE = LazyPattern(r"[ \t\n\r]*")
+JSON_NUMBER_TAIL = LazyPattern(r"[0-9.eE+-]*")
+
+
+@dataclass
+class JsonReader:
+    """Reads json values from a stream of byte chunks, keeping only the unread
+    part of the text in memory"""
+
+    chunks: Iterator[bytes]
+    text: str = ""
+    pos: int = 0
+    done: bool = False
+    decoder: Any = field(default_factory=json.JSONDecoder)
+    utf8: Any = None
+
+    def __post_init__(self):
+        import codecs
+
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def fill(self, size: int = 1) -> bool:
+        # reads until at least `size` more characters arrived, or the end
+        text = [self.text[self.pos :]]
+        wanted = len(text[0]) + size
+        length = len(text[0])
+        while length < wanted and not self.done:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.done = True
+                text.append(self.utf8.decode(b"", final=True))
+            else:
+                text.append(self.utf8.decode(chunk))
+            length += len(text[-1])
+        self.text = "".join(text)
+        self.pos = 0
+        return length > len(text[0])
+
+    def peek(self) -> str:
+        while True:
+            self.pos = JSON_SPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError("unexpected end of json")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at {self.text[self.pos:][:20]!r}")
+        self.pos += 1
+
+    def skip(self, char: str) -> bool:
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                (value, end) = self.decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                value = end = None
+            # a value reaching the end of the text could continue in the next
+            # chunk, for a number that includes a cut after `.` or `e` (`2.`
+            # decodes as 2 and leaves the `.` behind)
+            if end is not None and not self.done:
+                tail = end
+                if isinstance(value, (int, float)):
+                    tail = JSON_NUMBER_TAIL.match(self.text, end).end()
+                if tail == len(self.text):
+                    end = None
+            if end is not None:
+                self.pos = end
+                return value
+            # doubling what is read keeps a value split across chunks linear
+            if not self.fill(max(len(self.text) - self.pos, 1)):
+                raise ValueError("unexpected end of json")
+
+    def items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.skip("]"):
+            return
+        while True:
+            yield self.value()
+            if self.skip("]"):
+                return
+            self.expect(",")
+
+
+def parse_page(chunks: Iterator[bytes], key: str, convert: Callable[[dict], Any]):
+    """Decodes a json object whose `key` list is converted item by item, so the
+    raw list is never held in memory"""
+    reader = JsonReader(chunks)
+    page = {}
+    reader.expect("{")
+    if reader.skip("}"):
+        return page
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key:
+            page[key] = [convert(item) for item in reader.items()]
+        else:
+            page[name] = reader.value()
+        if reader.skip("}"):
+            return page
+        reader.expect(",")
+
+
 @dataclass
 class JiraApi:
     args: Namespace
@@ -300,18 +1900,149 @@ class JiraApi:
         if env.jira_remember_me:
             self.cookies["seraph.rememberme.cookie"] = env.jira_remember_me
         self.host = env.jira_host
+        # a host with a scheme (e.g. http://127.0.0.1:8080) is used as is
+        self.base_url = self.host if "://" in self.host else f"https://{self.host}"
+        self.timeout = env.jira_timeout
+        self.workers = env.jira_workers
+        self.pool_size = env.jira_pool_size
+        self.retries = env.jira_retries
+        self.limiter = RateLimiter(env.jira_rate_limit, env.jira_burst, self.pool_size)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.cache = ResponseCache(env.cache_dir, env.cache_max_bytes, env.cache_ttls)
+        self.workflows = WorkflowCache(f"{env.cache_dir}/workflows.json")
+        self.boards = BoardStore(f"{env.cache_dir}/boards", env.board_max_age)
+        self.completions = Completions(f"{env.cache_dir}/completion", env.jira_board_id)
+        self.boards.on_update = self.completions.board_updated
+        self.configure(args)
+
+    def configure(self, args: Namespace) -> None:
+        no_cache = getattr(args, "no_cache", False)
         self.args = args
+        self.cache.read = not no_cache and not getattr(args, "refresh", False)
+        self.cache.write = not no_cache
+        self.workflows.read = self.cache.read
+        self.workflows.write = self.cache.write
+        self.boards.read = self.cache.read
+        self.boards.write = self.cache.write
 
-    def post(self, endpoint, payload):
-        url = f"https://{self.host}{endpoint}"
-        res = r.post(
-            url,
-            proxies=self.proxies,
-            cookies=self.cookies,
-            headers=self.headers,
-            verify=False,
-            json=payload,
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.create_session(self.pool_size, self.retries)
+        return self._session
+
+    def create_session(self, pool_size: int, retries: int):
+        with TRACER.span("requests", "imports"):
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            import requests
+            import urllib3
+
+        urllib3.disable_warnings()
+        session = requests.Session()
+        session.proxies.update(self.proxies)
+        session.cookies.update(self.cookies)
+        session.headers.update(self.headers)
+        session.verify = False
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=0.5,
+            # 429 and 503 are paced and retried by the RateLimiter
+            status_forcelist=[500, 502, 504],
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def forked(self) -> None:
+        # after os.fork the pooled connections are still the parent's, the
+        # child opens its own instead of talking over the same sockets
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def connection_stats(self) -> Tuple[int, int]:
+        opened = 0
+        sent = 0
+        if self._session is None:
+            return (0, 0)
+        adapter = self.session.get_adapter(self.base_url)
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            sent += pool.num_requests
+        return (opened, max(sent - opened, 0))
+
+    def print_connection_stats(self):
+        (opened, reused) = self.connection_stats()
+        print(
+            f"http-connections: opened [{colored(opened, 'yellow')}] "
+            f"reused [{colored(reused, 'green')}]"
         )
+
+    def request(self, method: str, endpoint: str, **kwargs):
+        session = self.session
+        from requests.exceptions import RequestException
+
+        url = f"{self.base_url}{endpoint}"
+        attempt = 0
+        try:
+            while True:
+                started = self.limiter.acquire()
+                (status, headers) = (None, {})
+                try:
+                    with TRACER.span(f"{method} {endpoint}", "http") as span:
+                        res = session.request(
+                            method, url, timeout=self.timeout, **kwargs
+                        )
+                        (status, headers) = (res.status_code, res.headers)
+                        # a streamed body is read by the caller, not here
+                        length = headers.get("Content-Length")
+                        span.set(
+                            status=status,
+                            bytes=length if kwargs.get("stream") else len(res.content),
+                        )
+                finally:
+                    delay = self.limiter.release(started, status, headers, attempt)
+                if status not in (429, 503) or attempt >= self.retries:
+                    return res
+                if delay > MAX_RETRY_WAIT:
+                    return res
+                res.close()
+                if self.args.verbose:
+                    message = f"jira answered {status}, retrying in {delay:.1f}s"
+                    print(colored(message, "yellow"))
+                attempt += 1
+        except RequestException as e:
+            if self.args.verbose:
+                print(colored(str(e), "red"))
+            print(
+                colored(
+                    f"\n# Tried to call jira but the connection failed ({type(e).__name__})",
+                    "yellow",
+                )
+            )
+            return None
+
+    def post(self, endpoint, payload):
+        res = self.request("POST", endpoint, json=payload)
+        if res is None:
+            return None
+        self.cache.invalidate(endpoint)
         if res.status_code != 200 and res.status_code != 201:
             if self.args.verbose:
                 print(colored(res.text, "red"))
@@ -325,47 +2056,22 @@ class JiraApi:
             return None
         return res.json()
 
-    def get_all_epics(self, board_id: str, query: Optional[str] = None):
-        # TODO: make this a while is not last keep fetching
-        res = self.get(f"/rest/agile/1.0/board/{board_id}/epic")
-        if res is None:
-            exit()
-        epics = [
+    def get_all_epics(
+        self, board_id: str, query: Optional[str] = None, pick_single=False
+    ):
+        # `pick_single` skips the prompt when exactly one epic matches
+        labels = (
             f"{epic.get('key')} -- {epic.get('name')}"
-            for epic in res.get("values")
-            # if query is None or query.lower() in epic.get('name').lower()
-        ]
-        res = self.get(f"/rest/agile/1.0/board/{board_id}/epic?startAt=50")
-        if res is None:
-            exit()
-        epics2 = [
-            f"{epic.get('key')} -- {epic.get('name')}"
-            for epic in res.get("values")
-            # if query is None or query.lower() in epic.get('name').lower()
-        ]
-        epics = epics + epics2
-        res = self.get(f"/rest/agile/1.0/board/{board_id}/epic?startAt=100")
-        if res is None:
-            exit()
-        epics2 = [
-            f"{epic.get('key')} -- {epic.get('name')}"
-            for epic in res.get("values")
-            # if query is None or query.lower() in epic.get('name').lower()
-        ]
-        epics = epics + epics2
-        res = self.get(f"/rest/agile/1.0/board/{board_id}/epic?startAt=150")
-        if res is None:
-            exit()
-        epics2 = [
-            f"{epic.get('key')} -- {epic.get('name')}"
-            for epic in res.get("values")
-            # if query is None or query.lower() in epic.get('name').lower()
-        ]
-        epics = epics + epics2
-        epics = [e for e in epics if query is None or query.lower() in e.lower()]
+            for epic in self.get_board_values(board_id, "epic")
+        )
+        epics = [e for e in labels if query is None or query.lower() in e.lower()]
         epics.sort(
             key=lambda e: int(e.split("--")[0].split("-")[1].strip()), reverse=True
         )
+        if pick_single and len(epics) == 1:
+            return epics[0].split("--")[0].strip()
+        import inquirer
+
         answers = inquirer.prompt(
             [
                 inquirer.List("epic", message="which epic?", choices=epics),
@@ -387,35 +2093,218 @@ class JiraApi:
 
         return self.post("/rest/inline-create/1.0/issue", payload)
 
-    def get_all_sprints(self, board_id: str):
-        qs = {}
-        query = ""
-        res = self.get(f"/rest/agile/1.0/board/{board_id}/sprint?{query}")
-        assert res is not None
-        sprints = res.get("values")
-
-        startAt = 0
-
-        while res and not res["isLast"]:
-            startAt += 50
-            qs["startAt"] = str(startAt)
-            query = "&".join([f"{k}={v}" for (k, v) in qs.items()])
-            res = self.get(f"/rest/agile/1.0/board/{board_id}/sprint?{query}")
-            assert res is not None
-            sprints = sprints + res.get("values")
-
-        return sprints
-
-    def get(self, endpoint):
-        url = f"https://{self.host}{endpoint}"
-        res = r.get(
-            url,
-            proxies=self.proxies,
-            cookies=self.cookies,
-            headers=self.headers,
-            verify=False,
+    def search_issues(
+        self,
+        jql: str,
+        fields: str,
+        convert: Optional[Callable[[dict], Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Any]:
+        # validateQuery=warn keeps `key in (...)` working when a key is missing
+        jql = urllib.parse.quote(jql)  # type: ignore
+        endpoint = f"/rest/api/2/search?jql={jql}&fields={fields}&validateQuery=warn"
+        return self.paginate(
+            endpoint, "issues", page_size=100, limit=limit, convert=convert
         )
+
+    def get_transitions(self, key: str) -> Optional[List[dict]]:
+        res = self.get(f"/rest/api/2/issue/{key}/transitions")
+        return None if res is None else res.get("transitions", [])
+
+    def post_transition(self, key: str, transition_id: str) -> Tuple[bool, str]:
+        endpoint = f"/rest/api/2/issue/{key}/transitions"
+        res = self.request("POST", endpoint, json={"transition": {"id": transition_id}})
+        if res is None:
+            return (False, "connection failed")
+        self.cache.invalidate(endpoint)
+        if res.status_code in (200, 204):
+            return (True, "")
+        try:
+            messages = res.json().get("errorMessages") or [res.text]
+        except ValueError:
+            messages = [res.text]
+        return (False, f"{res.status_code} {' '.join(messages)}".strip())
+
+    def transition_issues(self, issues: List[dict], status: str):
+        """Moves issues (with status and issuetype fields) to `status`
+
+        Transitions are looked up once per issue type and current status, in
+        parallel, and cached. The POSTs run on a pool bounded by `workers`.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def workflow(issue):
+            fields = issue["fields"]
+            return (fields["issuetype"]["id"], fields["status"]["name"])
+
+        missing = {}
+        for issue in issues:
+            (issue_type, current) = workflow(issue)
+            if self.workflows.get(issue_type, current) is None:
+                missing.setdefault((issue_type, current), issue["key"])
+
+        def move(issue) -> TransitionResult:
+            key = issue["key"]
+            (issue_type, current) = workflow(issue)
+            if current.lower() == status.lower():
+                return TransitionResult(key, True, f"already {current}")
+            transitions = self.workflows.get(issue_type, current) or []
+            cached = find_transition(transitions, status)
+            if cached:
+                (ok, error) = self.post_transition(key, cached["id"])
+                if ok:
+                    target = cached.get("to", cached)["name"]
+                    return TransitionResult(key, True, f"{current} -> {target}")
+            # the cached workflow may be stale, ask jira about this issue
+            transitions = self.get_transitions(key) or []
+            transition = find_transition(transitions, status)
+            if cached and transition and transition["id"] == cached["id"]:
+                return TransitionResult(key, False, error)
+            if transition is None:
+                names = ", ".join(t["to"]["name"] for t in transitions if t.get("to"))
+                return TransitionResult(
+                    key, False, f"no transition from {current} to {status} ({names})"
+                )
+            self.workflows.put(issue_type, current, transitions)
+            (ok, error) = self.post_transition(key, transition["id"])
+            target = transition.get("to", transition)["name"]
+            return TransitionResult(key, ok, f"{current} -> {target}" if ok else error)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            lookups = list(missing.items())
+            found = pool.map(lambda item: self.get_transitions(item[1]), lookups)
+            for (((issue_type, current), _), transitions) in zip(lookups, found):
+                if transitions is not None:
+                    self.workflows.put(issue_type, current, transitions)
+            results = list(pool.map(move, issues))
+        self.workflows.save()
+        return results
+
+    def get_all_sprints(self, board_id: str):
+        return self.get_board_values(board_id, "sprint")
+
+    def get_active_sprints(self, board_id: str):
+        # a stored list can predate a sprint rollover and still mark the old
+        # sprint active, so the active page is always asked for; the full list
+        # is only filled (or refreshed once stale) in the background
+        endpoint = f"/rest/agile/1.0/board/{board_id}/sprint"
+        fetch = self.board_fetcher(board_id, "sprint")
+        if self.boards.peek(board_id, "sprint", fetch) is None and self.boards.write:
+            self.boards.refresh(board_id, "sprint", fetch)
+        res = self.get(f"{endpoint}?state=active")
+        if res is None:
+            exit(1)
+        return res["values"]
+
+    def board_fetcher(self, board_id: str, kind: str) -> Callable[[], List[dict]]:
+        endpoint = f"/rest/agile/1.0/board/{board_id}/{kind}"
+        return lambda: list(self.paginate(endpoint))
+
+    def get_board_values(self, board_id: str, kind: str) -> List[dict]:
+        fetch = self.board_fetcher(board_id, kind)
+        return self.boards.get(board_id, kind, fetch)
+
+    def page_endpoint(self, endpoint: str, start_at: int, page_size: int) -> str:
+        separator = "&" if "?" in endpoint else "?"
+        return f"{endpoint}{separator}startAt={start_at}&maxResults={page_size}"
+
+    def get_page(self, endpoint: str, start_at: int, page_size: int, items=None):
+        return self.get(self.page_endpoint(endpoint, start_at, page_size), items)
+
+    def paginate(
+        self,
+        endpoint: str,
+        key="values",
+        page_size=50,
+        first: Optional[dict] = None,
+        limit: Optional[int] = None,
+        convert: Optional[Callable[[dict], Any]] = None,
+    ) -> Iterator[Any]:
+        # `first` is an already fetched first page, `limit` stops fetching
+        # pages once that many items were requested, `convert` maps each item
+        converted = (key, convert) if convert else None
+        if first is None:
+            first = self.get_page(endpoint, 0, page_size, converted)
+        if first is None:
+            exit(1)
+        items = first.get(key) or []
+        step = first.get("maxResults") or len(items) or page_size
+        total = first.get("total")
+        is_last = first["isLast"] if "isLast" in first else total is None
+        if limit is not None:
+            total = limit if total is None else min(total, limit)
+        if is_last or not items or (total is not None and step >= total):
+            yield from items
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # pages after the first are fetched ahead on a bounded pool; when the
+        # endpoint only reports isLast we fetch speculatively and stop at the end
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        pending = deque()
+        next_start = step
+        try:
+            while True:
+                while len(pending) < self.workers and (
+                    total is None or next_start < total
+                ):
+                    future = pool.submit(
+                        self.get_page, endpoint, next_start, step, converted
+                    )
+                    pending.append(future)
+                    next_start += step
+                if items:
+                    yield from items
+                    items = []
+                if not pending:
+                    break
+                page = pending.popleft().result()
+                if page is None:
+                    exit(1)
+                values = page.get(key) or []
+                yield from values
+                if total is None and (page.get("isLast", True) or not values):
+                    break
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get(
+        self,
+        endpoint,
+        items: Optional[Tuple[str, Callable[[dict], Any]]] = None,
+        ttl: Optional[int] = None,
+    ):
+        # with `items` the list under that key is converted one item at a time,
+        # uncached responses are parsed as they stream in instead of via .json();
+        # `ttl` overrides the endpoint's, 0 skips the cache for reads that decide
+        # a state change
+        ttl = self.cache.ttl_for(endpoint) if ttl is None else ttl
+        entry = self.cache.load(self.host, endpoint) if ttl else None
+        headers = {}
+        if entry:
+            if self.cache.is_fresh(entry, ttl):
+                return convert_items(entry["body"], items)
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        stream = items is not None and not ttl
+        res = self.request("GET", endpoint, headers=headers, stream=stream)
+        if res is None:
+            return None
+        if res.status_code == 304 and entry:
+            validators = {
+                "ETag": res.headers.get("ETag") or entry.get("etag"),
+                "Last-Modified": res.headers.get("Last-Modified")
+                or entry.get("last_modified"),
+            }
+            self.cache.store(self.host, endpoint, entry["body"], validators)
+            return convert_items(entry["body"], items)
+        # a streamed response holds its pooled connection until it is closed,
+        # and the pool blocks once every connection is taken
         if res.status_code == 404:
+            res.close()
             print(
                 colored(
                     f"\n# Tried to call jira but we received {res.status_code}",
@@ -427,21 +2316,43 @@ class JiraApi:
         elif res.status_code != 200:
             if self.args.verbose:
                 print(colored(res.text, "red"))
+            res.close()
             print(
                 colored(
                     f"\n# Tried to call jira but we received {res.status_code}",
                     "yellow",
                 )
             )
-            print(
-                colored(
-                    "Please open jira in your browser and update ja with the cookie `seraph.rememberme.cookie`"
+            if res.status_code in (429, 503):
+                wait = retry_after(res.headers.get("Retry-After"))
+                later = f" in {wait:.0f}s" if wait else " later"
+                print(colored(f"jira is rate limiting us, try again{later}"))
+            elif res.status_code in (401, 403):
+                print(
+                    colored(
+                        "Please open jira in your browser and update ja with the cookie"
+                        " `seraph.rememberme.cookie`"
+                    )
                 )
-            )
-            print(colored("ja -s <cookie-value>", "blue"))
+                print(colored("ja -s <cookie-value>", "blue"))
             print()
             return None
-        return res.json()
+        if stream:
+            from requests.exceptions import RequestException
+
+            (key, convert) = items
+            try:
+                with TRACER.span(f"parse {endpoint}", "http"), res:
+                    chunks = res.iter_content(STREAM_CHUNK_SIZE)
+                    return parse_page(chunks, key, convert)
+            except (RequestException, ValueError) as e:
+                message = f"\n# Tried to read jira's answer but it failed ({e})"
+                print(colored(message, "yellow"))
+                return None
+        body = res.json()
+        if ttl:
+            self.cache.store(self.host, endpoint, body, res.headers)
+        return convert_items(body, items)
 
 
 @dataclass
@@ -449,6 +2360,11 @@ class Cli:
     args: Namespace
     env: Env
     jira: JiraApi
+    repo: "RepoContext" = None  # type: ignore
+
+    def __post_init__(self):
+        if self.repo is None:
+            self.repo = RepoContext(self.args, self.env)
 
     def run(self, parser: ArgumentParser):
         if self.args.verbose:
@@ -474,8 +2390,26 @@ class Cli:
             self.create_jira_ticket()
         elif self.args.search:
             self.search()
+        elif self.args.list:
+            self.list_board()
+        elif self.args.transition:
+            self.transition()
+        elif self.args.workspace:
+            self.workspace()
         elif self.args.new:
             self.create()
+        elif self.args.sync:
+            self.sync()
+        elif self.args.watch:
+            self.watch()
+        elif self.args.install_hook:
+            self.install_hook()
+        elif self.args.prefetch:
+            self.prefetch()
+        elif self.args.completion:
+            self.completion(parser)
+        elif self.args.refresh_completions:
+            self.refresh_completions()
         elif not self.args.verbose:
             parser.print_help()
 
@@ -491,7 +2425,7 @@ class Cli:
             print(f'status [{colored("done", "green")}]')
 
     def open(self):
-        (branch, ticket) = get_ticket_from_branch(self.args, self.env)
+        (branch, ticket) = self.repo.branch_ticket
         url = None
         if self.args.open == "j":
             url = (
@@ -511,13 +2445,12 @@ class Cli:
         if url:
             if self.args.verbose:
                 print(url)
-            os.system(f'xdg-open "{url}"')
+            self.repo.open_link(url)
 
     def save_env(self, print_update_message=True):
-        with open(GLOBAL_CONFIG_PATH, "w") as fh:
-            fh.write(f"{self.env}")
-            if print_update_message:
-                print(f"update rc [{colored('done', 'green')}]")
+        changed = save_config(self.env)
+        if print_update_message:
+            print(f"update rc [{colored('done' if changed else 'unchanged', 'green')}]")
 
     def save_session(self):
         if "github.main_branch=" in self.args.save_session:
@@ -532,31 +2465,186 @@ class Cli:
             self.env.set_session(self.args.save_session)
         self.save_env()
 
+    def desc_endpoint(self, ticket: str) -> str:
+        # only the header fields, comments are paged separately
+        fields = "summary,description,assignee,customfield_10006,customfield_10003"
+        return f"/rest/api/2/issue/{ticket}?fields={fields},customfield_11100"
+
+    def comments_endpoint(self, ticket: str) -> str:
+        return f"/rest/api/2/issue/{ticket}/comment?orderBy=-created"
+
+    def pr_endpoint(self, ticket: str) -> str:
+        # issuetype lets --pr move the ticket without looking it up again
+        fields = "summary,customfield_10006,status,issuetype"
+        return f"/rest/api/2/issue/{ticket}?fields={fields}"
+
+    def install_hook(self):
+        (error, hook_path) = shell("git rev-parse --git-path hooks/post-checkout")
+        if error:
+            print(colored(error, "red"))
+            exit(1)
+        ja_path = os.path.join(os.path.dirname(os.path.dirname(RUN_PATH)), "bin", "ja")
+        marker = "# ja: prefetch the ticket on branch checkout"
+        hook = (
+            f"{marker}\n"
+            'if [ "$3" = "1" ]; then\n'
+            f'  "{sys.executable}" "{ja_path}" --prefetch --no-daemon >/dev/null 2>&1 &\n'
+            "fi\n"
+        )
+        content = ""
+        if os.path.isfile(hook_path):
+            with open(hook_path) as fh:
+                content = fh.read()
+        if marker in content:
+            print(f"hook already installed at {hook_path}")
+            return
+        if content and not appendable_hook(content):
+            print(
+                colored(
+                    f"{hook_path} is not a plain sh/bash hook ja can extend,"
+                    " add this to it yourself:",
+                    "yellow",
+                )
+            )
+            print(f"\n{hook}")
+            return
+        if not content:
+            content = "#!/bin/sh\n"
+        os.makedirs(os.path.dirname(hook_path), exist_ok=True)
+        with open(hook_path, "w") as fh:
+            fh.write(content.rstrip("\n") + "\n\n" + hook)
+        os.chmod(hook_path, 0o755)
+        print(f"installed {hook_path} [{colored('done', 'green')}]")
+
+    def prefetch(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        try:
+            os.setsid()
+        except OSError:
+            pass
+        (_, ticket) = self.repo.branch_ticket
+        lock_dir = f"{self.env.cache_dir}/prefetch"
+        lock_path = f"{lock_dir}/{ticket}.lock"
+        os.makedirs(lock_dir, exist_ok=True)
+        try:
+            if time.time() - os.stat(lock_path).st_mtime < PREFETCH_WINDOW:
+                return
+            os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return
+
+        # keep it cheap: short timeouts, no retries, only what desc reads (pr
+        # reads the status live)
+        self.jira.timeout = PREFETCH_TIMEOUT
+        self.jira.retries = 0
+        endpoints = [
+            self.desc_endpoint(ticket),
+            self.jira.page_endpoint(
+                self.comments_endpoint(ticket), 0, COMMENTS_PAGE_SIZE
+            ),
+        ]
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            list(pool.map(self.jira.get, endpoints))
+
+    def completion(self, parser: ArgumentParser):
+        path = self.jira.completions.path
+        os.makedirs(path, exist_ok=True)
+        options = sorted(
+            option
+            for action in parser._actions
+            if action.help != argparse.SUPPRESS
+            for option in action.option_strings
+        )
+        script = COMPLETION_SCRIPT.replace("@DIR@", shlex.quote(path))
+        script = script.replace("@OPTIONS@", " ".join(options))
+        if self.args.completion == "zsh":
+            script = "autoload -U +X bashcompinit && bashcompinit\n" + script
+        print(script)
+        # the first completion should not wait for the next hourly refresh
+        if self.jira.completions.is_stale():
+            self.jira.completions.claim()
+            spawn_ja(["--refresh-completions"])
+
+    def refresh_completions(self):
+        try:
+            os.setsid()
+        except OSError:
+            pass
+        completions = self.jira.completions
+        # the local index has every ticket, otherwise the recent ones are asked
+        index = IssueIndex(self.env.index_path)
+        if index.exists():
+            issues: Iterator[Issue] = iter(index.recent(COMPLETION_TICKETS))
+        else:
+            jql = f"project = {self.env.jira_project_key} ORDER BY updated DESC"
+            issues = self.jira.search_issues(
+                jql, "summary", Issue.from_json, limit=COMPLETION_TICKETS
+            )
+        lines = [f"{issue.key}\t{issue.summary or ''}" for issue in issues]
+        completions.update("tickets", lines)
+        board_id = self.env.jira_board_id
+        if board_id:
+            for kind in ("sprint", "epic"):
+                values = self.jira.get_board_values(board_id, kind)
+                completions.board_updated(board_id, kind, values)
+
     def desc(self):
-        (branch, ticket) = get_ticket_from_branch(self.args, self.env)
-        r = self.jira.get(
-            f"/rest/api/2/issue/{ticket}?"
-        )  # fields=summary,description,customfield_10006,customfield_11100
+        (branch, ticket) = self.repo.branch_ticket
+        pager = start_pager() if self.args.pager else None
+        stdout = sys.stdout
+        if pager:
+            sys.stdout = pager.stdin
+        try:
+            self.print_ticket(ticket)
+        except BrokenPipeError:
+            # the pager was closed before everything was written
+            pass
+        finally:
+            sys.stdout = stdout
+            if pager:
+                try:
+                    pager.stdin.close()
+                except BrokenPipeError:
+                    pass
+                pager.wait()
+
+    def print_ticket(self, ticket: str):
+        from concurrent.futures import ThreadPoolExecutor
+
+        limit = self.args.comments
+        comments_endpoint = self.comments_endpoint(ticket)
+        # the first comment page loads while the header is fetched and printed
+        pool = ThreadPoolExecutor(max_workers=1)
+        first_page = None
+        if limit != 0:
+            first_page = pool.submit(
+                self.jira.get_page, comments_endpoint, 0, COMMENTS_PAGE_SIZE
+            )
+        pool.shutdown(wait=False)
+
+        r = self.jira.get(self.desc_endpoint(ticket))
         if r is None:
             exit(1)
-        summary = r["fields"]["summary"].replace('"', "").replace("'", "")
-        description = (
-            (r["fields"]["description"] if r["fields"].get("description") else "")
-            .replace('"', "")
-            .replace("'", "")
-        )
+        summary = r["fields"]["summary"]
+        description = r["fields"].get("description") or ""
         points = (
             r["fields"]["customfield_10006"]
             if r["fields"].get("customfield_10006")
             else ""
         )
         points = f"({points}) " if points else ""
-        github = r["fields"]["customfield_11100"]
-        pr_status = github.split(", details=PullRequestOverallDetails")[0].split(
-            "state="
-        )[1]
-        pr_status = f"PR:{pr_status} "
-        comments = r["fields"]["comment"]
+        github = r["fields"].get("customfield_11100") or ""
+        pr_status = ""
+        if "state=" in github:
+            pr_status = github.split(", details=PullRequestOverallDetails")[0].split(
+                "state="
+            )[1]
+            pr_status = f"PR:{pr_status} "
         owner = (
             r["fields"]["assignee"]["displayName"]
             if r["fields"].get("assignee")
@@ -568,33 +2656,68 @@ class Cli:
             else ""
         )
 
-        pretty_print_ticket(
-            description, pr_status, points, owner, summary, r["key"], epic
-        )
+        with TRACER.span("pretty_print_ticket", "render"):
+            pretty_print_ticket(
+                description, pr_status, points, owner, summary, r["key"], epic
+            )
+            sys.stdout.flush()
 
-        for c in comments["comments"]:
+        if first_page is None:
+            return
+        page = first_page.result()
+        if page is None:
+            exit(1)
+        total = page.get("total", len(page.get("comments") or []))
+        shown = total if limit is None else min(limit, total)
+        print(colored(f"# {shown} of {total} comments, newest first\n", "blue"))
+        # a server that ignores orderBy puts the newest on the last page, then
+        # every page is read and reversed before `limit` applies
+        first = page.get("comments") or []
+        ascending = len(first) > 1 and first[1]["created"] > first[0]["created"]
+        comments = self.jira.paginate(
+            comments_endpoint,
+            "comments",
+            COMMENTS_PAGE_SIZE,
+            page,
+            None if ascending else limit,
+        )
+        comments = newest_first(comments)
+        with TRACER.span("comments", "render") as span:
+            span.set(count=self.print_comments(comments, limit))
+
+    def print_comments(self, comments: Iterator[dict], limit: Optional[int]) -> int:
+        from datetime import datetime
+
+        count = 0
+        for c in comments:
+            if limit is not None and count >= limit:
+                break
+            count += 1
             display_name = c["author"]["displayName"]
-            # body = c["body"].replace('"', "").replace("'", "").strip()
             updated = datetime.strptime(
                 c["updated"], "%Y-%m-%dT%H:%M:%S.%f%z"
             ).strftime("%Y-%m-%d %H:%M %z")
             print(f'{colored(updated, "blue")} {colored(display_name, "yellow")}')
-            # llines = [line for line in body.split("\n") if line and line.strip() != ""]
-            # print("> " + "> ".join(llines))
-            print(c["body"])
+            print(render_jira(c["body"]))
             print("")
+            sys.stdout.flush()
+        return count
 
     def branch(self):
-        shell("git fetch -a")
-        output = shell(
-            "git for-each-ref --sort=-committerdate refs/heads/ --format='%(refname:short)'",
-            err_exit=True,
+        from concurrent.futures import ThreadPoolExecutor
+
+        # fetch and status run while refs are read and tickets are looked up
+        fetch = run_background("git fetch -a")
+        status = run_background("git status --porcelain --untracked-files=no")
+        refs = run_process(
+            "git for-each-ref --sort=-committerdate refs/heads/ "
+            "--format='%(refname:short)%09%(objectname)'"
         )
-        branches = output.replace("'", "").split("\n")
-        # branches = ["".join(branch.split("*")).strip() for branch in output.split("\n")]
-        # branches = ["".join(b.split("remotes/origin/")).strip() for b in branches]
-        # branches = list(set(branches))
-        # branches.sort(key=lambda x: x, reverse=True)
+        if refs.error:
+            print(colored(refs.error, "red"))
+            exit(1)
+        oids = dict(line.split("\t") for line in refs.stdout.split("\n") if line)
+        branches = list(oids)
 
         if self.args.branch != "*" and self.args.branch != "f":
             branches = [branch for branch in branches if self.args.branch in branch]
@@ -602,10 +2725,28 @@ class Cli:
             print("no branches found")
             exit()
 
-        branch = gum(
-            "What branch?", branches, "choose" if self.args.branch != "f" else "filter"
+        pool = ThreadPoolExecutor(max_workers=1)
+        tickets = pool.submit(self.branch_tickets, branches)
+        pool.shutdown(wait=False)
+        fetch.result()
+        base = self.env.environment["github"]["main_branch"].split(",")[0].strip()
+        counts = ahead_behind(
+            {branch: oids[branch] for branch in branches},
+            base,
+            f"{self.env.cache_dir}/ahead-behind.json",
         )
-        output = shell("git status --porcelain --untracked-files=no", err_exit=True)
+        labels = branch_labels(branches, tickets.result(), counts)
+
+        label = gum(
+            "What branch?",
+            list(labels),
+            "choose" if self.args.branch != "f" else "filter",
+        )
+        branch = labels.get(label, label)
+        if status.result().error:
+            print(colored(status.result().error, "red"))
+            exit(1)
+        output = status.result().stdout
         if output == "":
             shell(f"git checkout {branch}", err_exit=True)
         else:
@@ -617,25 +2758,74 @@ class Cli:
             )
             print(output)
 
+    def branch_tickets(self, branches: List[str]) -> Dict[str, Issue]:
+        keys = sorted({key for key in map(branch_ticket, branches) if key})
+        if not keys:
+            return {}
+        from concurrent.futures import ThreadPoolExecutor
+
+        def search(chunk: List[str]) -> List[Issue]:
+            jql = f"key in ({', '.join(chunk)})"
+            fields = "status,assignee,customfield_10006"
+            return list(self.jira.search_issues(jql, fields, Issue.from_json))
+
+        # long key lists are split so the query string stays well under url limits
+        chunks = [
+            keys[i : i + KEYS_PER_QUERY] for i in range(0, len(keys), KEYS_PER_QUERY)
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                pages = list(pool.map(search, chunks))
+        except SystemExit:
+            # annotations are optional, the picker works without jira
+            return {}
+        return {issue.key: issue for page in pages for issue in page}
+
     def push(self):
-        branch = get_branch(self.args)
+        branch = self.repo.branch
         push_branch_cmd = f"git push --set-upstream origin {branch}"
         print(push_branch_cmd + "\n")
-        output = shell(push_branch_cmd, err_exit=True)
-        print(output)
+        shell(push_branch_cmd, err_exit=True, stream=True)
 
     def rebase(self):
         cmd = f"git pull --rebase origin {self.env.github_main_branch}"
         print(f" > {cmd}")
-        shell(cmd, err_exit=True)
+        shell(cmd, err_exit=True, stream=True)
+
+    def workspace(self):
+        repos = self.env.workspace_repos
+        if not repos and self.env.workspace_root:
+            repos = discover_repos(self.env.workspace_root)
+        if not repos:
+            print("no workspace repos, add them to ~/.jarc.yml:")
+            print("  workspace:\n    root: ~/code\n    # or repos: [~/code/api, ...]")
+            exit(1)
+        main_branch = self.env.environment["github"]["main_branch"].split(",")[0]
+        workspace = Workspace(repos, main_branch.strip())
+        results = workspace.run(self.args.workspace)
+        workspace.print_summary(results)
+        if not all(result.ok for result in results):
+            exit(1)
 
     def search(self):
-        summary = input("title contains: ")
-        epic_q = input("epic contains: ")
-        show_rejected = "y" in input("show rejected [N/y]: ").lower()
+        table = self.args.output == "table"
+        if self.args.title is not None:
+            (summary, epic_q) = (self.args.title, self.args.epic or "")
+            show_rejected = self.args.all
+        else:
+            # prompts stay off stdout when it carries ndjson/csv
+            prompt = input if table else ask
+            summary = prompt("title contains: ")
+            epic_q = self.args.epic
+            if epic_q is None:
+                epic_q = prompt("epic contains: ")
+            show_rejected = "y" in prompt("show rejected [N/y]: ").lower()
         epic_link = None
         if epic_q:
-            epic_link = self.jira.get_all_epics(self.env.jira_board_id, epic_q)
+            # only --epic (not the prompt) picks a lone match without asking
+            epic_link = self.jira.get_all_epics(
+                self.env.jira_board_id, epic_q, self.args.epic is not None
+            )
         summary_filter = (
             f'summary !~ "{summary[1:]}"'
             if summary and summary != "" and "!" == summary[0]
@@ -656,65 +2846,141 @@ class Cli:
                     f'AND "Epic Link" = "{epic_link}" '
                     f"ORDER BY updated DESC"
                 )
-        # os.system('clear')
-        print()
-        print(f"jql: {jql}")
-        print()
-        jql = urllib.parse.quote(jql)  # type: ignore
-        data = self.jira.get(f"/rest/api/2/search?jql={jql}")
-        if data is None:
-            exit()
-
-        points = "points".ljust(6, " ")
-        summary = "summary"
-        status = "status".ljust(13, " ")
-        key = "key".ljust(13, " ")
-        who = "assignee".ljust(20, " ")
-        print(f"{status} | {key} | {points} | {who} | {summary}")
-
-        points = "---".ljust(6, "-")
-        summary = "---".ljust(107, "-")
-        status = "---".ljust(13, "-")
-        key = "---".ljust(13, "-")
-        who = "---".ljust(20, "-")
-        print(f"{status} | {key} | {points} | {who} | {summary}")
-
-        issues = data.get("issues")
-        order = {
-            "Rejected": 0,
-            "To Do": 1,
-            "To Develop": 2,
-            "In Progress": 3,
-            "In Review": 4,
-            "In Test": 5,
-            "Done": 6,
-        }
-        issues.sort(key=lambda x: order.get(x.get("fields").get("status").get("name")))
-        total_points = 0.0
-        for issue in issues:
-            status = issue.get("fields").get("status").get("name").ljust(13, " ")
-            if not show_rejected and status.strip() == "Rejected":
-                continue
-            points = str(issue.get("fields").get("customfield_10006") or "0.0").ljust(
-                6, " "
-            )
-            p = float(points)
-            total_points += p
-            summary = issue.get("fields").get("summary")[0:107].ljust(107, ".")
-            key = issue.get("key").ljust(13, " ")
-            who = (
-                issue.get("fields").get("assignee").get("displayName")
-                if issue.get("fields").get("assignee")
-                else "-"
+        index = IssueIndex(self.env.index_path)
+        if not self.args.live and index.exists():
+            if self.args.verbose:
+                print(f"index: [{colored(index.path, 'green')}]", file=sys.stderr)
+            issues = index.search(summary, epic_link)
+            last_sync = (
+                f"last sync: {index.last_sync_label()} (use --live to query jira)"
             )
-            who = who.ljust(20, " ")[0:20]
-            print(f"{status} | {key} | {points} | {who} | {summary}")
+            if not table:
+                self.write_issues(issues, show_rejected)
+                print(last_sync, file=sys.stderr)
+                return
+            rows = sort_by_status([issue.row() for issue in issues])
+            print()
+            print_search_rows(rows, show_rejected)
+            print()
+            print(last_sync)
+            return
 
-        print()
-        print(f"total points: {total_points}")
+        if table:
+            print()
+            print(f"jql: {jql}")
+            print()
+        elif self.args.verbose:
+            print(f"jql: {jql}", file=sys.stderr)
+        jql = urllib.parse.quote(jql)  # type: ignore
+        # rows are printed page by page as they arrive, in jql order
+        fields = "summary,status,assignee,customfield_10006"
+        if not table:
+            fields += ",customfield_10003,updated"
+        issues = self.jira.paginate(
+            f"/rest/api/2/search?jql={jql}&fields={fields}",
+            "issues",
+            page_size=100,
+            convert=Issue.from_json,
+        )
+        if not table:
+            self.write_issues(issues, show_rejected)
+            return
+        print_search_rows((issue.row() for issue in issues), show_rejected)
         print()
         print(f"ref: https://{self.env.jira_host}/issues/?jql={jql}")
 
+    def write_issues(self, issues: Iterator[Issue], show_rejected: bool):
+        records = (
+            issue.as_dict()
+            for issue in issues
+            if show_rejected or issue.status != "Rejected"
+        )
+        write_records(records, list(Issue.__slots__), self.args.output)
+
+    def list_board(self):
+        kind = self.args.list[:-1]
+        values = self.jira.get_board_values(self.env.jira_board_id, kind)
+        columns = BOARD_COLUMNS[kind]
+        if self.args.output != "table":
+            write_records(values, columns, self.args.output)
+            return
+        rows = [[str(value.get(c) or "") for c in columns] for value in values]
+        widths = [
+            min(max([len(column)] + [len(row[i]) for row in rows]), 60)
+            for (i, column) in enumerate(columns)
+        ]
+        for row in [columns, ["-" * width for width in widths]] + rows:
+            cells = (cell[:width].ljust(width) for (cell, width) in zip(row, widths))
+            print(" | ".join(cells))
+
+    def transition(self):
+        (status, *values) = self.args.transition
+        if self.args.jql:
+            jql = self.args.jql
+        else:
+            keys = [normalize_ticket(value, self.env) for value in values]
+            if None in keys:
+                print(colored(f"invalid ticket in {values}", "red"))
+                exit(1)
+            if not keys:
+                keys = [self.repo.branch_ticket[1]]
+            jql = f"key in ({', '.join(keys)})"
+        results = self.move_tickets(jql, status)
+        if not all(result.ok for result in results):
+            exit(1)
+
+    def move_tickets(self, jql: str, status: str) -> List[TransitionResult]:
+        issues = list(self.jira.search_issues(jql, "status,issuetype"))
+        if self.args.verbose:
+            print(f"jql: {jql}")
+        wanted = re.findall(r"[A-Z][A-Z0-9]*-\d+", jql) if "key in" in jql else []
+        found = {issue["key"] for issue in issues}
+        missing = [key for key in wanted if key not in found]
+        results = [TransitionResult(key, False, "not found") for key in missing]
+        if issues:
+            results += self.jira.transition_issues(issues, status)
+        if wanted:
+            order = {key: i for (i, key) in enumerate(wanted)}
+            results.sort(key=lambda result: order.get(result.key, len(order)))
+        print_moves(results, status)
+        if not results:
+            print(colored(f"no tickets match {jql}", "yellow"))
+        return results
+
+    def sync(self):
+        index = IssueIndex(self.env.index_path)
+        print(f"> syncing {index.path} (last sync: {index.last_sync_label()})")
+        count = index.sync(self.jira, "CFCCON")
+        print(f"synced {count} issues [{colored('done', 'green')}]")
+
+    def watch(self):
+        res = {"values": self.jira.get_active_sprints(self.env.jira_board_id)}
+        if not res["values"]:
+            print(colored("no active sprint", "yellow"))
+            exit(1)
+        sprint = res["values"][self.select_active_sprint(res)]
+        watch = SprintWatch(self.jira, sprint["id"], max(self.args.watch, 1))
+        issues = watch.load()
+        print_search_rows(sort_by_status([issue.row() for issue in issues]), True)
+        print()
+        print(f"watching {sprint['name']} ({len(issues)} tickets), ctrl-c to stop")
+        try:
+            while True:
+                time.sleep(watch.interval)
+                try:
+                    changes = watch.poll()
+                except SystemExit:
+                    # jira is unreachable or rejected the session, try later
+                    watch.backoff()
+                    continue
+                if changes:
+                    print(f"\n{time.strftime('%H:%M:%S')}")
+                    print("\n".join(changes))
+                elif self.args.verbose:
+                    print(f"no changes, next poll in {watch.interval:.0f}s")
+        except KeyboardInterrupt:
+            print()
+
     def create_jira_ticket(self):
         # TODO: Add epics
         # TODO: Add acceptance criteria
@@ -741,21 +3007,27 @@ class Cli:
         ]
         choices.sort(key=lambda x: x)
         choices = active_sprint + special_sprints + choices
-        answers = inquirer.prompt(
-            [
-                inquirer.Text("userstory", message="What is the user story"),
-                inquirer.List("sprint", message="which sprint?", choices=choices),
-                # inquirer.Text("ac", message="Acceptance Criteria (can be empty)"),
-                # inquirer.Text("how", message="How (can be empty)"),
-            ]
-        )
+        sprint_name = self.args.sprint
+        if sprint_name and sprint_name.lower() not in (s.lower() for s in choices):
+            print(colored(f"no open sprint named {sprint_name}", "red"))
+            exit(1)
+        import inquirer
+
+        questions = [
+            inquirer.Text("userstory", message="What is the user story"),
+            inquirer.List("sprint", message="which sprint?", choices=choices),
+            # inquirer.Text("ac", message="Acceptance Criteria (can be empty)"),
+            # inquirer.Text("how", message="How (can be empty)"),
+        ]
+        answers = inquirer.prompt(questions[:1] if sprint_name else questions)
 
         if not answers:
             exit(1)
 
         # print(answers)
         userstory = answers.get("userstory")
-        selected_sprint = [s for s in sprints if s["name"] == answers.get("sprint")][0]
+        sprint_name = (sprint_name or answers.get("sprint")).lower()
+        selected_sprint = [s for s in sprints if s["name"].lower() == sprint_name][0]
         res = self.jira.create_ticket(userstory, selected_sprint["id"])
         if res is None:
             exit(1)
@@ -778,6 +3050,8 @@ class Cli:
         if previous_sprint_idx != -1:
             return previous_sprint_idx
 
+        import inquirer
+
         sprint_choises = [
             f"{idx} -- {sprint['name']}" for idx, sprint in enumerate(sprints)
         ]
@@ -799,11 +3073,17 @@ class Cli:
             print("to save the user id: `ja -s u:ab123`")
             print("to save the board id: `ja -s b:7192`")
             exit()
-        res = self.jira.get(
-            f"/rest/agile/1.0/board/{self.env.jira_board_id}/sprint?state=active"
-        )
-        if res is None:
-            exit(1)
+        from concurrent.futures import ThreadPoolExecutor
+
+        # git and jira run side by side; the sprint picked last time is usually
+        # still the active one, so its tickets are fetched with the sprint list
+        status = run_background("git status --porcelain --untracked-files=no")
+        guess = self.env.jira_active_sprint_id
+        pool = ThreadPoolExecutor(max_workers=2)
+        sprints = pool.submit(self.jira.get_active_sprints, self.env.jira_board_id)
+        guessed = pool.submit(self.todo_issues, guess) if guess else None
+        pool.shutdown(wait=False)
+        res = {"values": sprints.result()}
         sprint_idx = self.select_active_sprint(res)
         sprint = res["values"][sprint_idx]
         sprint_id = sprint.get("id")
@@ -813,36 +3093,13 @@ class Cli:
         sprint_number_pattern = re.compile(sprint_number_regex)
         sprint_number = sprint_number_pattern.search(sprint_name).group()
 
-        jql = (
-            "project = CFCCON "
-            'AND status = "To Develop" '
-            "AND resolution = Unresolved "
-            f"AND assignee in ({self.env.jira_user_id}) "
-            "ORDER BY priority DESC, updated DESC"
-        )
-        res = self.jira.get(
-            f"/rest/agile/1.0/board/{self.env.jira_board_id}/sprint/{sprint_id}/issue?jql={jql}"
-        )
-        if res is None:
-            exit(1)
-        issues = res["issues"]
-        if not issues:
-            jql = (
-                "project = CFCCON "
-                'AND status = "To Do" '
-                "AND resolution = Unresolved "
-                f"AND assignee in ({self.env.jira_user_id}) "
-                "ORDER BY priority DESC, updated DESC"
-            )
-            res = self.jira.get(
-                f"/rest/agile/1.0/board/{self.env.jira_board_id}/sprint/{sprint_id}/issue?jql={jql}"
-            )
-            if res is None:
-                exit(1)
-            issues = res["issues"]
-        tickets = [
-            f"{issue['key']} -- {issue['fields']['summary']}" for issue in issues
-        ]
+        if guessed and sprint_id == guess:
+            issues = guessed.result()
+        else:
+            issues = self.todo_issues(sprint_id)
+        tickets = [f"{issue.key} -- {issue.summary}" for issue in issues]
+        import inquirer
+
         questions = [
             inquirer.List("ticket", message="What ticket?", choices=tickets),
             inquirer.Text("branchdesc", message="Enter branch description"),
@@ -854,19 +3111,19 @@ class Cli:
         ticket_key = ticket.split(" -- ")[0]
         desc = str(answers.get("branchdesc")).replace(" ", "_")
         branch_name = f"s{sprint_number}/{ticket_key}-{desc}"
-        output = shell("git status --porcelain --untracked-files=no", err_exit=True)
+        if status.result().error:
+            print(colored(status.result().error, "red"))
+            exit(1)
+        output = status.result().stdout
         if output == "":
+            # one checkout, starting the branch from the base branch
+            checkout = f"git checkout -B {branch_name} {self.env.github_main_branch}"
             print("")
-            print(f"> git checkout {self.env.github_main_branch}")
-            print(f"> git checkout -B {branch_name}")
-            shell(f"git checkout {self.env.github_main_branch}", err_exit=True)
-            shell(f"git checkout -B {branch_name}", err_exit=True)
+            print(f"> {checkout}")
+            shell(checkout, err_exit=True)
             lets_continue = input(f"> Lets move it to doing? [Y/n]: ")
             if "n" not in lets_continue.lower():
-                self.jira.post(
-                    f"/rest/api/2/issue/{ticket_key}/transitions",
-                    payload={"transition": {"id": T.doing.id}},
-                )
+                self.move_tickets(f"key in ({ticket_key})", T.doing.name)
         else:
             print(
                 colored(
@@ -876,21 +3133,48 @@ class Cli:
             )
             print(output)
 
+    def todo_issues(self, sprint_id) -> List[Issue]:
+        # one query for both statuses, "To Do" is only offered when nothing is
+        # left to develop
+        jql = (
+            "project = CFCCON "
+            'AND status in ("To Develop", "To Do") '
+            "AND resolution = Unresolved "
+            f"AND assignee in ({self.env.jira_user_id}) "
+            "ORDER BY priority DESC, updated DESC"
+        )
+        endpoint = (
+            f"/rest/agile/1.0/board/{self.env.jira_board_id}/sprint/{sprint_id}/issue"
+            f"?jql={jql}&fields=summary,status"
+        )
+        # a single page keeps this to one round trip, the picker shows one page
+        res = self.jira.get_page(endpoint, 0, 100, ("issues", Issue.from_json))
+        if res is None:
+            exit(1)
+        issues = res["issues"]
+        to_develop = [issue for issue in issues if issue.status == "To Develop"]
+        return to_develop or [issue for issue in issues if issue.status == "To Do"]
+
     def pr(self):
-        branch = get_branch(self.args)
+        from concurrent.futures import ThreadPoolExecutor
+
+        # the jira lookup is the only network call, everything else is done
+        # while it is in flight
+        (_, ticket) = self.repo.branch_ticket
+        pool = ThreadPoolExecutor(max_workers=1)
+        # the status decides the move to code review, it is never read cached
+        pending = pool.submit(self.jira.get, self.pr_endpoint(ticket), ttl=0)
+        pool.shutdown(wait=False)
         user = self.env.github_repo.split("/")[0]
         link = (
             f"https://{self.env.github_host}/"
             f"{self.env.github_repo}/compare/{self.env.github_main_branch}...{user}:"
-            f"{branch}"
+            f"{self.repo.branch}"
         )
         print("\n# Pull Request")
         print(f"- link: {link}")
-
-        (_, ticket) = get_ticket_from_branch(self.args, self.env)
-        response = self.jira.get(
-            f"/rest/api/2/issue/{ticket}" "?fields=summary,customfield_10006,status"
-        )
+        self.repo.warm("clipboard", "opener")
+        response = pending.result()
 
         if response:
             summary = response["fields"]["summary"]
@@ -901,54 +3185,439 @@ class Cli:
             )
             points = points if points else 0
             name = f"[#{ticket}] - ({points}) {summary}"
-            copy_to_clipboard(name)
+            copied = self.repo.copy(name)
             print(f"- name: {colored(name, 'yellow')}")
-            print(colored("  # copied the name to your clipboard!", "green"))
+            if copied:
+                print(colored("  # copied the name to your clipboard!", "green"))
             status_name = response["fields"]["status"]["name"]
-            ticket_id = response["id"]
             if status_name == T.doing.name or status_name == T.daily.name:
                 print("")
                 lets_continue = input(f"> Lets move it to code review? [Y/n]: ")
                 if "n" not in lets_continue.lower():
-                    self.jira.post(
-                        f"/rest/api/2/issue/{ticket_id}/transitions",
-                        payload={"transition": {"id": T.code_review.id}},
-                    )
+                    status = T.code_review.name
+                    print_moves(self.jira.transition_issues([response], status), status)
 
-        open_link(link, press_enter_message=True)
+        self.repo.open_link(link, press_enter_message=True)
 
 
-def signal_handler(sig, frame):
-    print("")
-    sys.exit(0)
+@dataclass
+class RepoResult:
+    path: str
+    ok: bool
+    message: str
+    branch: str = ""
+    ahead: int = 0
+    behind: int = 0
+    dirty: int = 0
+    duration: float = 0.0
 
 
-def open_link(link, press_enter_message=False):
-    if press_enter_message:
-        print(colored("\n[press enter to open in browser]", "blue"), end="")
-        input()
-    (error, machine) = shell("uname -s")
-    if not error and machine == "Linux":
-        os.system(f'xdg-open "{link}"')
-    elif not error and machine == "Darwin":
-        os.system(f'open "{link}"')
-    else:
-        print(
-            colored(
-                f"could not detect your OS machine:[{machine}] error:[{error}]",
-                "yellow",
+@dataclass
+class Workspace:
+    repos: List[str]
+    main_branch: str
+
+    def run(self, action: str) -> List[RepoResult]:
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        # each repo runs its git commands in order, the repos run side by side
+        results = []
+        with ThreadPoolExecutor(max_workers=min(len(self.repos), 16)) as pool:
+            futures = [pool.submit(self.run_repo, repo, action) for repo in self.repos]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                label = colored("done", "green")
+                if not result.ok:
+                    label = colored("failed", "red")
+                print(
+                    f"[{len(results)}/{len(self.repos)}] "
+                    f"{os.path.basename(result.path).ljust(24)} {action} [{label}] "
+                    f"{result.message} ({result.duration:.1f}s)"
+                )
+        results.sort(key=lambda result: os.path.basename(result.path))
+        return results
+
+    def run_repo(self, path: str, action: str) -> RepoResult:
+        start = time.perf_counter()
+        result = self.status(path)
+        if result.ok and action != "status":
+            result = self.apply(path, action, result)
+        result.duration = time.perf_counter() - start
+        return result
+
+    def status(self, path: str, message="") -> RepoResult:
+        cmd = "git status --porcelain=v2 --branch --untracked-files=no"
+        process = run_process(cmd, cwd=path)
+        if not process.ok:
+            return RepoResult(path, False, (process.error or "").split("\n")[-1])
+        result = RepoResult(path, True, message or "up to date")
+        for line in process.stdout.split("\n"):
+            if line.startswith("# branch.head "):
+                result.branch = line[len("# branch.head ") :]
+            elif line.startswith("# branch.ab "):
+                (ahead, behind) = line[len("# branch.ab ") :].split()
+                (result.ahead, result.behind) = (int(ahead), -int(behind))
+            elif line and not line.startswith("#"):
+                result.dirty += 1
+        if not message and (result.ahead or result.behind):
+            result.message = f"{result.ahead} ahead, {result.behind} behind"
+        if not message and result.dirty:
+            result.message = f"{result.dirty} changed"
+        return result
+
+    def base_branch(self, path: str) -> str:
+        cmd = "git symbolic-ref --short refs/remotes/origin/HEAD"
+        process = run_process(cmd, cwd=path)
+        if process.ok and "/" in process.stdout:
+            return process.stdout.split("/", 1)[1]
+        return self.main_branch
+
+    def apply(self, path: str, action: str, status: RepoResult) -> RepoResult:
+        from dataclasses import replace
+
+        if action == "fetch":
+            cmd = "git fetch --all --prune"
+        elif status.branch == "(detached)":
+            return replace(status, message="detached HEAD, skipped")
+        elif action == "rebase":
+            if status.dirty:
+                return replace(status, message=f"{status.dirty} changed, skipped")
+            cmd = f"git pull --rebase origin {self.base_branch(path)}"
+        elif status.branch == self.base_branch(path):
+            return replace(status, message=f"on {status.branch}, skipped")
+        else:
+            cmd = f"git push --set-upstream origin {status.branch}"
+        process = run_process(cmd, cwd=path)
+        if not process.ok:
+            if action == "rebase":
+                run_process("git rebase --abort", cwd=path)
+            result = RepoResult(path, False, (process.error or "").split("\n")[-1])
+            result.branch = status.branch
+            return result
+        past = {"fetch": "fetched", "rebase": "rebased", "push": "pushed"}[action]
+        return self.status(path, past)
+
+    def print_summary(self, results: List[RepoResult]):
+        repo = "repo".ljust(24)
+        branch = "branch".ljust(30)
+        state = "result".ljust(8)
+        print(f"\n{repo} | {branch} | {state} | ahead | behind | changed | message")
+        rules = ["-" * 24, "-" * 30, "-" * 8, "-----", "------", "-------", "-------"]
+        print(" | ".join(rules))
+        for result in results:
+            repo = os.path.basename(result.path).ljust(24)[:24]
+            branch = result.branch.ljust(30)[:30]
+            state = colored("ok".ljust(8), "green")
+            if not result.ok:
+                state = colored("failed".ljust(8), "red")
+            print(
+                f"{repo} | {branch} | {state} | {str(result.ahead).ljust(5)} | "
+                f"{str(result.behind).ljust(6)} | {str(result.dirty).ljust(7)} | "
+                f"{result.message}"
             )
-        )
+        failed = len([result for result in results if not result.ok])
+        print(f"\n{len(results) - failed}/{len(results)} repos ok")
+
+
+def discover_repos(root: str, depth: int = 2) -> List[str]:
+    repos = []
+    pending = [(root, 0)]
+    while pending:
+        (path, level) = pending.pop()
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            if entry.name == "node_modules":
+                continue
+            if os.path.exists(os.path.join(entry.path, ".git")):
+                repos.append(entry.path)
+            elif level + 1 < depth:
+                pending.append((entry.path, level + 1))
+    return sorted(repos)
 
 
-def copy_to_clipboard(text):
-    (error, machine) = shell("uname -s")
-    if not error and machine == "Linux":
-        os.system(f'echo "{text}" | xclip -i -selection clipboard')
-    elif not error and machine == "Darwin":
-        os.system(f'echo "{text}" | pbcopy')
+@dataclass
+class Daemon:
+    parser: ArgumentParser
+    args: Namespace
+    env: Env
+    jira: "JiraApi"
+    config_stat: Optional[Tuple[int, int]] = None
+    version: str = ""
+
+    def serve(self):
+        import socket
+
+        os.makedirs(os.path.dirname(DAEMON_SOCKET), exist_ok=True)
+        if os.path.exists(DAEMON_SOCKET):
+            os.remove(DAEMON_SOCKET)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        previous_umask = os.umask(0o077)
+        server.bind(DAEMON_SOCKET)
+        os.umask(previous_umask)
+        server.listen(8)
+        with open(DAEMON_PID, "w") as fh:
+            fh.write(str(os.getpid()))
+        signal.signal(signal.SIGTERM, self.stop)
+        # a forwarded ctrl-c interrupts the command as KeyboardInterrupt
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        self.version = code_version()
+        self.config_stat = config_stat()
+        print(f"ja daemon listening on {DAEMON_SOCKET} (pid {os.getpid()})")
+        sys.stdout.flush()
+        while True:
+            (conn, _) = server.accept()
+            self.reap()
+            try:
+                self.handle(server, conn)
+            except (KeyboardInterrupt, SystemExit, OSError):
+                # a ctrl-c forwarded right as the command finished, or a
+                # client that went away before its reply
+                pass
+            finally:
+                conn.close()
+
+    def stop(self, sig=None, frame=None):
+        for path in (DAEMON_SOCKET, DAEMON_PID):
+            if os.path.exists(path):
+                os.remove(path)
+        os._exit(0)
+
+    def reap(self):
+        try:
+            while os.waitpid(-1, os.WNOHANG)[0]:
+                pass
+        except ChildProcessError:
+            pass
+
+    def reload_env(self):
+        stat = config_stat()
+        if stat == self.config_stat:
+            return
+        self.config_stat = stat
+        self.env = get_env(self.args)
+        self.jira = JiraApi(self.env, self.args)
+
+    def handle(self, server, conn):
+        import socket
+
+        (message, fds, _, _) = socket.recv_fds(conn, 1024 * 1024, 3)
+        while not message.endswith(b"\n"):
+            chunk = conn.recv(1024 * 1024)
+            if not chunk:
+                return
+            message += chunk
+        request = json.loads(message)
+        if request.get("version") != self.version or len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            conn.sendall(b'{"code": null}\n')
+            if request.get("version") != self.version:
+                print("code changed, stopping the daemon")
+                self.stop()
+            return
+
+        self.reload_env()
+        saved = self.attach(request, fds)
+        pid = None
+        code = 0
+        try:
+            args = self.parser.parse_args(request["argv"])
+            if not runs_in_daemon(args):
+                pid = os.fork()
+                if pid == 0:
+                    self.run_forked(server, conn, args)
+                return
+            code = self.execute(conn, args)
+        except SystemExit as e:
+            code = exit_code(e.code)
+        finally:
+            if pid != 0:
+                self.detach(saved)
+        conn.sendall(json.dumps({"code": code}).encode() + b"\n")
+
+    def attach(self, request: dict, fds: List[int]) -> tuple:
+        # the command writes to the client's terminal, in its env and cwd
+        saved = (
+            [os.dup(fd) for fd in (0, 1, 2)],
+            (sys.stdin, sys.stdout, sys.stderr),
+            dict(os.environ),
+            os.getcwd(),
+        )
+        for (fd, target) in zip(fds, (0, 1, 2)):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", closefd=False, buffering=1)
+        sys.stderr = open(2, "w", closefd=False, buffering=1)
+        os.environ.clear()
+        os.environ.update(request["environ"])
+        os.chdir(request["cwd"])
+        return saved
+
+    def detach(self, saved: tuple) -> None:
+        (saved_fds, saved_streams, saved_environ, saved_cwd) = saved
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except OSError:
+            pass
+        (sys.stdin, sys.stdout, sys.stderr) = saved_streams
+        for (fd, target) in zip(saved_fds, (0, 1, 2)):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        os.chdir(saved_cwd)
+
+    def run_forked(self, server, conn, args: Namespace) -> None:
+        # a fork starts from the warm daemon but must not share its pooled
+        # connections, and its exit must not touch the daemon's socket files
+        code = 1
+        try:
+            server.close()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self.jira.forked()
+            code = self.execute(conn, args)
+            conn.sendall(json.dumps({"code": code}).encode() + b"\n")
+        finally:
+            os._exit(code)
+
+    def execute(self, conn, args: Namespace) -> int:
+        state = {"done": False}
+        lock = threading.Lock()
+
+        def watch_client():
+            try:
+                data = conn.recv(64)
+            except OSError:
+                data = b""
+            with lock:
+                if data and not state["done"]:
+                    signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+
+        code = 0
+        try:
+            threading.Thread(target=watch_client, daemon=True).start()
+            TRACER.configure(args)
+            run_command(self.parser, args, self.env, self.jira)
+        except KeyboardInterrupt:
+            print()
+            code = 130
+        except SystemExit as e:
+            code = exit_code(e.code)
+        except Exception:
+            import traceback
+
+            traceback.print_exc()
+            code = 1
+        finally:
+            with lock:
+                state["done"] = True
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            except OSError:
+                pass
+        return code
+
+
+# Cli.run's commands in the order it checks them (keep the two in sync)
+COMMAND_FLAGS = [
+    "pr",
+    "desc",
+    "open",
+    "branch",
+    "rebase",
+    "save_session",
+    "update",
+    "push",
+    "create",
+    "search",
+    "list",
+    "transition",
+    "workspace",
+    "new",
+    "sync",
+    "watch",
+    "install_hook",
+    "prefetch",
+    "completion",
+    "refresh_completions",
+]
+# never wait on the user or on git, so the daemon runs them itself
+DAEMON_COMMANDS = {"desc", "list", "transition", "completion"}
+
+
+def runs_in_daemon(args: Namespace) -> bool:
+    """Whether the daemon serves a command in its own process, reusing its
+    jira session and caches, instead of in a fork. Anything that can prompt,
+    page, watch or hand the terminal to git runs in a fork so it never holds
+    up another terminal"""
+    command = next((flag for flag in COMMAND_FLAGS if getattr(args, flag)), None)
+    if command == "desc":
+        return not args.pager
+    return command in DAEMON_COMMANDS
+
+
+def exit_code(code) -> int:
+    return code if isinstance(code, int) else (0 if code is None else 1)
+
+
+def daemon_pid() -> Optional[int]:
+    try:
+        with open(DAEMON_PID) as fh:
+            pid = int(fh.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+def daemon_command(action: str, parser: ArgumentParser, args: Namespace):
+    pid = daemon_pid()
+    if action == "serve":
+        env = get_env(args)
+        Daemon(parser, args, env, JiraApi(env, args)).serve()
+    elif action == "start":
+        if pid:
+            print(f"daemon already running [{colored(pid, 'green')}]")
+            return
+        os.makedirs(os.path.dirname(DAEMON_SOCKET), exist_ok=True)
+        with open(f"{os.path.dirname(DAEMON_SOCKET)}/daemon.log", "a") as log:
+            subprocess.Popen(
+                [sys.executable, RUN_PATH, "--daemon", "serve"],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+            )
+        for _ in range(50):
+            if os.path.exists(DAEMON_SOCKET) and daemon_pid():
+                print(f"daemon started [{colored(daemon_pid(), 'green')}]")
+                return
+            time.sleep(0.1)
+        print(colored("daemon did not start, see ~/.cache/ja/daemon.log", "yellow"))
+    elif action == "stop":
+        if not pid:
+            print("daemon is not running")
+            return
+        os.kill(pid, signal.SIGTERM)
+        print(f"daemon stopped [{colored('done', 'green')}]")
+    elif pid:
+        print(f"daemon running [{colored(pid, 'green')}] on {DAEMON_SOCKET}")
     else:
-        print(f"could not detect your OS machine:[{machine}] error:[{error}]")
+        print("daemon is not running")
+
+
+def signal_handler(sig, frame):
+    print("")
+    sys.exit(0)
 
 
 def remove_characters(line: str, to_remove: List[str]):
@@ -959,7 +3628,7 @@ def remove_characters(line: str, to_remove: List[str]):
 
 
 def gum(message: str, items: List[str], action="choose") -> str:
-    if g_has_gum:
+    if has_tool("gum"):
         if action == "filter":
             options = "\n".join(items)
             result = subprocess.check_output(
@@ -974,6 +3643,8 @@ def gum(message: str, items: List[str], action="choose") -> str:
             )
             return result.stdout.strip()
     else:
+        import inquirer
+
         questions = [inquirer.List("items", message=message, choices=items)]
         answers = inquirer.prompt(questions)
         result = answers.get("items") if answers else None
@@ -982,27 +3653,211 @@ def gum(message: str, items: List[str], action="choose") -> str:
         return result
 
 
-def jira_to_md(text: str):
-    replaceitems = [
-        ("h1.", "#"),
-        ("h2.", "##"),
-        ("h3.", "###"),
-        ("h4.", "####"),
-        ("h5.", "####"),
-        ("----", "      -"),
-        ("---", "    -"),
-        ("--", "  -"),
-        ("****", "      *"),
-        ("***", "    *"),
-        ("**", "  *"),
-        ("{code}", "```"),
-        ("{color:red}", "*"),
-        ("{color}", "*"),
-    ]
-    output = text
-    for jira, md in replaceitems:
-        output = output.replace(jira, md)
-    return output
+JIRA_HEADING = LazyPattern(r"^h([1-6])\.\s*(.*)$")
+JIRA_LIST = LazyPattern(r"^([*#-]+)\s+(.*)$")
+JIRA_BLOCK = LazyPattern(r"^\{(code|noformat|quote)(?::[^}]*)?\}(.*)$")
+JIRA_SECTION = LazyPattern(
+    r"^(acceptance criteria|how|screens?|references)\s*:?$", re.IGNORECASE
+)
+JIRA_INLINE = LazyPattern(
+    r"\{code(?::[^}]*)?\}(?P<code>.*?)\{code\}"
+    r"|\{noformat\}(?P<noformat>.*?)\{noformat\}"
+    r"|\{\{(?P<mono>.+?)\}\}"
+    r"|\{color:(?P<color>[^}]*)\}(?P<colored>.*?)\{color\}"
+    r"|\[(?:(?P<label>[^|\]]*)\|)?(?P<link>[^|\]]+)\]"
+    r"|(?<![\w*])\*(?P<bold>[^*\s](?:[^*]*[^*\s])?)\*(?!\w)"
+    r"|(?<![\w_])_(?P<italic>[^_\s](?:[^_]*[^_\s])?)_(?!\w)"
+    r"|(?<![\w+])\+(?P<underline>[^+\s](?:[^+]*[^+\s])?)\+(?!\w)"
+    r"|(?P<emoticon>\((?:y|n|/|x|!|i|\?|on|off|\*)\))"
+)
+JIRA_EMOTICONS = {
+    "(y)": "\N{THUMBS UP SIGN}",
+    "(n)": "\N{THUMBS DOWN SIGN}",
+    "(/)": "\N{HEAVY CHECK MARK}",
+    "(x)": "\N{CROSS MARK}",
+    "(!)": "\N{WARNING SIGN}",
+    "(i)": "\N{INFORMATION SOURCE}",
+    "(?)": "\N{BLACK QUESTION MARK ORNAMENT}",
+    "(on)": "\N{ELECTRIC LIGHT BULB}",
+    "(off)": "\N{ELECTRIC LIGHT BULB}",
+    "(*)": "\N{WHITE MEDIUM STAR}",
+}
+JIRA_COLORS = {"red", "green", "yellow", "blue", "magenta", "cyan", "white"}
+ANSI_ESCAPE = LazyPattern(r"\x1b\[[0-9;]*m")
+
+
+def render_inline(match) -> str:
+    group = match.lastgroup
+    value = match.group(group)
+    if group in ("code", "noformat", "mono"):
+        return colored(value, "cyan")
+    if group == "colored":
+        color = match.group("color").lower()
+        text = JIRA_INLINE.sub(render_inline, value)
+        return colored(text, color) if color in JIRA_COLORS else text
+    if group == "link":
+        if value.startswith("~"):
+            return colored(f"@{value[1:]}", "blue")
+        label = match.group("label")
+        if label:
+            text = JIRA_INLINE.sub(render_inline, label)
+            return f"{colored(text, attrs=['underline'])} ({value})"
+        return colored(value, "blue", attrs=["underline"])
+    if group == "bold":
+        return colored(JIRA_INLINE.sub(render_inline, value), attrs=["bold"])
+    if group == "italic":
+        return colored(JIRA_INLINE.sub(render_inline, value), attrs=["dark"])
+    if group == "underline":
+        return colored(JIRA_INLINE.sub(render_inline, value), attrs=["underline"])
+    return JIRA_EMOTICONS[value]
+
+
+def split_cells(line: str) -> List[str]:
+    # pipes inside [label|url] links do not split a cell
+    cells = []
+    depth = 0
+    start = 0
+    for (i, char) in enumerate(line):
+        if char == "[":
+            depth += 1
+        elif char == "]" and depth:
+            depth -= 1
+        elif char == "|" and not depth:
+            cells.append(line[start:i])
+            start = i + 1
+    cells.append(line[start:])
+    return [cell.strip() for cell in cells if cell.strip()]
+
+
+def render_table(rows: List[str]) -> List[str]:
+    table = []
+    for row in rows:
+        header = row.startswith("||")
+        cells = [JIRA_INLINE.sub(render_inline, c) for c in split_cells(row)]
+        if header:
+            cells = [colored(c, attrs=["bold"]) for c in cells]
+        table.append(cells)
+    widths: List[int] = []
+    for cells in table:
+        for (i, cell) in enumerate(cells):
+            width = len(ANSI_ESCAPE.sub("", cell))
+            if i == len(widths):
+                widths.append(width)
+            elif width > widths[i]:
+                widths[i] = width
+    separator = colored(" | ", attrs=["dark"])
+    lines = []
+    for cells in table:
+        padded = [
+            cell + " " * (widths[i] - len(ANSI_ESCAPE.sub("", cell)))
+            for (i, cell) in enumerate(cells)
+        ]
+        lines.append(separator.join(padded).rstrip())
+    return lines
+
+
+def render_jira(text: str) -> str:
+    """Renders jira wiki markup as ANSI text in a single pass over the lines"""
+    lines: List[str] = []
+    block = None
+    table: List[str] = []
+    counters: List[int] = []
+    for line in text.splitlines():
+        if block:
+            end = "{" + block + "}"
+            closing = line.find(end)
+            content = line if closing == -1 else line[:closing]
+            if block == "quote":
+                if content.strip() or closing == -1:
+                    content = JIRA_INLINE.sub(render_inline, content)
+                    lines.append(colored("| ", attrs=["dark"]) + content)
+            elif content or closing == -1:
+                lines.append("    " + colored(content, "cyan"))
+            if closing != -1:
+                block = None
+            continue
+
+        stripped = line.strip()
+        if stripped.startswith("|"):
+            table.append(stripped)
+            continue
+        if table:
+            lines.extend(render_table(table))
+            table = []
+
+        result = JIRA_LIST.match(stripped)
+        if result:
+            marker = result.group(1)
+            depth = len(marker)
+            del counters[depth:]
+            counters.extend([0] * (depth - len(counters)))
+            if marker[-1] == "#":
+                counters[-1] += 1
+                bullet = f"{counters[-1]}."
+            else:
+                bullet = "\N{BULLET}"
+            content = JIRA_INLINE.sub(render_inline, result.group(2))
+            lines.append(f"{'  ' * depth}{colored(bullet, 'yellow')} {content}")
+            continue
+        counters = []
+
+        result = JIRA_BLOCK.match(stripped)
+        if result and "{" + result.group(1) + "}" not in result.group(2):
+            block = result.group(1)
+            if result.group(2):
+                lines.append("    " + colored(result.group(2), "cyan"))
+            continue
+
+        result = JIRA_HEADING.match(stripped)
+        if result:
+            content = JIRA_INLINE.sub(render_inline, result.group(2))
+            lines.append(colored(content, "red", attrs=["bold"]))
+            continue
+        if stripped.startswith("bq. "):
+            content = JIRA_INLINE.sub(render_inline, stripped[4:])
+            lines.append(colored("| ", attrs=["dark"]) + content)
+            continue
+        if len(stripped) >= 4 and stripped == "-" * len(stripped):
+            rule = "\N{BOX DRAWINGS LIGHT HORIZONTAL}" * 40
+            lines.append(colored(rule, attrs=["dark"]))
+            continue
+        if JIRA_SECTION.match(stripped):
+            lines.append(colored(stripped, "red"))
+            continue
+        lines.append(JIRA_INLINE.sub(render_inline, line))
+    if table:
+        lines.extend(render_table(table))
+    return "\n".join(lines)
+
+
+def newest_first(comments: Iterator[dict]) -> Iterator[dict]:
+    # jira server versions without orderBy on the comment endpoint return the
+    # oldest first, those have to be read fully and reversed
+    first = next(comments, None)
+    if first is None:
+        return
+    second = next(comments, None)
+    if second is None or second["created"] <= first["created"]:
+        yield first
+        if second is not None:
+            yield second
+        yield from comments
+        return
+    rest = [first, second] + list(comments)
+    rest.reverse()
+    yield from rest
+
+
+def start_pager():
+    if not sys.stdout.isatty():
+        return None
+    pager = os.environ.get("PAGER") or "less -FRX"
+    try:
+        return subprocess.Popen(
+            shlex.split(pager), stdin=subprocess.PIPE, text=True, encoding="utf-8"
+        )
+    except OSError:
+        return None
 
 
 def pretty_print_ticket(
@@ -1014,49 +3869,23 @@ def pretty_print_ticket(
     key: str,
     epic: str,
 ):
-    if g_has_glow:
-        desc_md = jira_to_md(description)
-        subprocess.check_call(
-            [
-                "bash",
-                "-c",
-                f"echo '> {key} {pr_status} {points} {owner} {epic}\n> {summary}' | glow",
-            ]
-        )
-        subprocess.check_call(["bash", "-c", f"echo '{desc_md}' | glow"])
-        subprocess.check_call(["bash", "-c", f"echo '---' | glow"])
-    else:
-        # for k in r['fields'].keys():
-        #   print(f"{k}|| {r['fields'][k]}")
-        print(
-            f"\n{emojize(':memo:')} "
-            f"{colored(key, 'red')} "
-            f"{colored(pr_status, 'yellow')}"
-            f"{colored(points, 'green')}"
-            f"{colored(epic, 'blue')}"
-            f"{colored(owner, 'blue')}"
-        )
-        print("   " + summary)
-        print("")
-        description = f'{colored("How", "red")}'.join(description.split("How"))
-        description = f'{colored("How", "red")}'.join(description.split("how"))
-        description = f'{colored("Screen", "red")}'.join(description.split("Screen"))
-        description = f'{colored("Acceptance Criteria", "red")}'.join(
-            description.split("Acceptance Criteria")
-        )
-        description = f'{colored("Acceptance Criteria", "red")}'.join(
-            description.split("Acceptance criteria")
-        )
-        description = f'{colored("Acceptance Criteria", "red")}'.join(
-            description.split("acceptance criteria")
-        )
-        description = f'{colored("References", "red")}'.join(
-            description.split("References")
-        )
-        print(emojize(description))
-        print("\n---\n")
+    header = (
+        f"\n\N{MEMO} "
+        f"{colored(key, 'red')} "
+        f"{colored(pr_status, 'yellow')}"
+        f"{colored(points, 'green')}"
+        f"{colored(epic, 'blue')}"
+        f"{colored(owner, 'blue')}"
+    )
+    sys.stdout.write(
+        f"{header}\n   {summary}\n\n{render_jira(description)}\n\n---\n\n"
+    )
 
 
-if __name__ == "__main__":
+def entrypoint():
     signal.signal(signal.SIGINT, signal_handler)
     main()
+
+
+if __name__ == "__main__":
+    entrypoint()